@@ -1,16 +1,57 @@
-from datetime import datetime
+import base64
+import csv
+import io
+import json
+import tempfile
+import time
+import uuid
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Literal
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, delete, func, select
 
-from app.db.engine import get_session
-from app.models.attendance import Attendance
-from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, BulkQuickLogBatch
-from app.services.analytics import calc_grouped_subjects, calc_subject_stat, dashboard_summary, monthly_snapshots, professor_breakdown
+from app.core.config import settings
+from app.core.perf import perf_recorder, phase
+from app.db.engine import get_read_session, get_session, offload, session_endpoint
+from app.db.journal import journal
+from app.db.replica import replica
+from app.models.attendance import Attendance, date_columns
+from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, BulkQuickLogBatch, ProfessorMergeBatch
+from app.services import aliases, rollup
+from app.services.cache import analytics_cache
+from app.services.ingest import import_csv, insert_rows
+from app.services.analytics import (
+    AttendanceCounts,
+    count_summary_groups,
+    dashboard_summary_from_counts,
+    grouped_subjects_from_counts,
+    monthly_snapshots_from_counts,
+    professor_breakdown_from_counts,
+    subject_stat_from_counts,
+)
 
 router = APIRouter()
 
+# Rows fetched per round trip while streaming an export.
+EXPORT_CHUNK = 2000
+EXPORT_COLUMNS = ("id", "date", "timestamp", "subject", "professor", "status", "count")
+# Import bodies above this spill from memory to a temporary file before parsing.
+IMPORT_SPOOL_BYTES = 1 << 20
+# Idempotency keys per IN (...) lookup when a bulk retry checks which rows already landed.
+KEY_LOOKUP_CHUNK = 500
+# Largest value SQLite stores in an INTEGER column; bigger cursor values cannot bind.
+SQLITE_MAX_INT = (1 << 63) - 1
+
 PROFESSORS = [
     "Satish Sir (Dean)",
     "Raghu Sir",
@@ -24,36 +65,409 @@ PROFESSORS = [
 ]
 
 
+@dataclass
+class AnalyticsWindow:
+    """Inclusive date range analytics are computed over; both ends open when unset."""
+
+    date_from: str | None = None
+    date_to: str | None = None
+
+    def contains(self, date_value: str) -> bool:
+        return (not self.date_from or date_value >= self.date_from) and (
+            not self.date_to or date_value <= self.date_to
+        )
+
+
+def _semester_range(semester: str) -> tuple[str, str]:
+    # (month, day) pairs in calendar order.
+    starts = sorted(
+        tuple(int(part) for part in start.strip().split("-"))
+        for start in settings.semester_starts.split(",")
+        if start.strip()
+    )
+    if semester == "current":
+        today = date.today()
+        year = today.year
+        started = [index for index, start in enumerate(starts) if start <= (today.month, today.day)]
+        if started:
+            index = started[-1]
+        else:
+            year, index = year - 1, len(starts) - 1
+    else:
+        try:
+            year_text, number = semester.split("-")
+            year, index = int(year_text), int(number) - 1
+        except ValueError:
+            raise HTTPException(status_code=400, detail="semester must be 'current' or YYYY-N")
+        if not 0 <= index < len(starts):
+            raise HTTPException(status_code=400, detail=f"semester number must be 1-{len(starts)} (SEMESTER_STARTS)")
+    try:
+        first = date(year, *starts[index])
+        following = date(year, *starts[index + 1]) if index + 1 < len(starts) else date(year + 1, *starts[0])
+    except ValueError:
+        # Years outside 1..9999 (or a last semester running into year 10000).
+        raise HTTPException(status_code=400, detail="semester year is out of range")
+    return first.isoformat(), (following - timedelta(days=1)).isoformat()
+
+
+def _iso_date(value: str | None, name: str) -> str | None:
+    if not value:
+        return None
+    try:
+        # Normalized so the range compares correctly against stored YYYY-MM-DD strings.
+        return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be a YYYY-MM-DD date")
+
+
+def analytics_window(
+    date_from: str | None = Query(None, alias="from", description="First date, YYYY-MM-DD (inclusive)"),
+    date_to: str | None = Query(None, alias="to", description="Last date, YYYY-MM-DD (inclusive)"),
+    semester: str | None = Query(
+        None, description="Instead of from/to: 'current' or YYYY-N, the Nth semester starting in YYYY (SEMESTER_STARTS)"
+    ),
+) -> AnalyticsWindow:
+    if semester:
+        if date_from or date_to:
+            raise HTTPException(status_code=400, detail="Pass either semester or from/to, not both")
+        return AnalyticsWindow(*_semester_range(semester))
+    window = AnalyticsWindow(_iso_date(date_from, "from"), _iso_date(date_to, "to"))
+    if window.date_from and window.date_to and window.date_from > window.date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    return window
+
+
+def _load_counts(
+    session: Session, window: AnalyticsWindow | None = None, day_subjects: bool = False
+) -> AttendanceCounts:
+    """Tallies for the analytics views; ``day_subjects`` also loads day x subject (monthly snapshots)."""
+    window = window or AnalyticsWindow()
+    with phase("db"):
+        professor_aliases = aliases.cached_alias_map(session, analytics_cache.version, settings.analytics_cache_ttl)
+    if journal is None:
+        return _read_counts(session, professor_aliases, window, day_subjects)
+    # Journaled rows not yet on the primary count as soon as they are acknowledged.
+    counts, entries = journal.read_consistent(
+        lambda: _read_counts(session, professor_aliases, window, day_subjects)
+    )
+    for row in entries:
+        if not window.contains(row["date"]):
+            continue
+        professor = professor_aliases.get(row["professor"], row["professor"])
+        counts.add(row["date"], professor, row["subject"], row["status"], row["count"], row["day_ordinal"])
+    return counts
+
+
+def _read_counts(
+    session: Session, professor_aliases: dict[str, str], window: AnalyticsWindow, day_subjects: bool
+) -> AttendanceCounts:
+    if settings.analytics_engine == "numpy":
+        # Imported here so the default engine never pays numpy's import time on a cold start.
+        from app.services import columnar
+
+        with phase("db"):
+            columns = columnar.snapshot(
+                session, analytics_cache.version, settings.analytics_cache_ttl, professor_aliases
+            )
+        with phase("analytics"):
+            return columns.to_counts(window.date_from, window.date_to)
+    # Aggregate in the database: only coarse (date, status), (professor, subject, status) and,
+    # when asked for, (date, subject, status) groups cross the wire, instead of every attendance row.
+    with phase("db"):
+        # The replica always maintains its own rollup.
+        use_rollup = settings.use_rollup or session.info.get("replica", False)
+        # A window becomes a range on the indexed date column, so only its groups are read.
+        groups = rollup.summary_groups(session, use_rollup, window.date_from, window.date_to, day_subjects)
+    with phase("analytics"):
+        return count_summary_groups(aliases.resolve_groups(groups, professor_aliases))
+
+
+def _written() -> None:
+    # Called after every write: drop cached analytics and have the replica catch up before its next read.
+    analytics_cache.invalidate()
+    if replica is not None:
+        replica.mark_dirty()
+
+
+def _track(session: Session, deltas: Counter) -> None:
+    if settings.use_rollup:
+        rollup.apply_deltas(session, deltas)
+
+
+def _unstored(session: Session, values: list[dict]) -> list[dict]:
+    # Rows of a retried bulk request whose per-row idempotency key is not on the primary yet.
+    keys = [v["idempotency_key"] for v in values]
+    stored: set[str] = set()
+    for start in range(0, len(keys), KEY_LOOKUP_CHUNK):
+        chunk = keys[start:start + KEY_LOOKUP_CHUNK]
+        stored.update(session.exec(select(Attendance.idempotency_key).where(Attendance.idempotency_key.in_(chunk))))
+    return [v for v in values if v["idempotency_key"] not in stored]
+
+
+def _drain_journal() -> None:
+    # Writes that match existing rows by value must also see rows still in the write-behind journal.
+    if journal is not None:
+        offload(journal.flush_all)
+
+
+@dataclass
+class AttendanceFilter:
+    date_from: str | None = None
+    date_to: str | None = None
+    professor: str | None = None
+    subject: str | None = None
+    status: str | None = None
+
+    def clauses(self) -> list:
+        clauses = []
+        if self.date_from:
+            clauses.append(Attendance.date >= self.date_from)
+        if self.date_to:
+            clauses.append(Attendance.date <= self.date_to)
+        if self.professor:
+            clauses.append(Attendance.professor == self.professor)
+        if self.subject:
+            clauses.append(Attendance.subject == self.subject)
+        if self.status:
+            clauses.append(Attendance.status == self.status)
+        return clauses
+
+    def matches(self, row: dict) -> bool:
+        """Same test as ``clauses()`` for rows held outside the database (the write-behind journal)."""
+        return (
+            (not self.date_from or row["date"] >= self.date_from)
+            and (not self.date_to or row["date"] <= self.date_to)
+            and (not self.professor or row["professor"] == self.professor)
+            and (not self.subject or row["subject"] == self.subject)
+            and (not self.status or row["status"] == self.status)
+        )
+
+
+def attendance_filter(
+    date_from: str | None = Query(None, alias="from", description="First date, YYYY-MM-DD (inclusive)"),
+    date_to: str | None = Query(None, alias="to", description="Last date, YYYY-MM-DD (inclusive)"),
+    professor: str | None = Query(None),
+    subject: str | None = Query(None),
+    status: str | None = Query(None, description="Present or Absent"),
+) -> AttendanceFilter:
+    filters = AttendanceFilter(_iso_date(date_from, "from"), _iso_date(date_to, "to"), professor, subject, status)
+    if filters.date_from and filters.date_to and filters.date_from > filters.date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    return filters
+
+
+def _encode_cursor(position: Attendance | int) -> str:
+    # A row for keyset paging, or how many write-behind rows have been served so far.
+    value = {"pending": position} if isinstance(position, int) else [position.date, position.id]
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int] | int:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if isinstance(value, dict):
+            served = value["pending"]
+            if _cursor_int(served):
+                return served
+        else:
+            date_value, row_id = value
+            if isinstance(date_value, str) and _cursor_int(row_id):
+                return date_value, row_id
+    except (ValueError, TypeError, KeyError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _cursor_int(value) -> bool:
+    return type(value) is int and 0 <= value <= SQLITE_MAX_INT
+
+
 @router.get("/health")
 def health():
-    return {"ok": True, "service": "attendace-api"}
+    payload = {"ok": True, "service": "attendace-api"}
+    if replica is not None:
+        payload["replica"] = replica.status()
+    if journal is not None:
+        payload["write_behind"] = journal.status()
+    return payload
 
 
 @router.get("/attendance")
-def list_attendance(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance).order_by(Attendance.id.desc()).limit(10)).all()
-    return rows
+@session_endpoint
+def list_attendance(
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(50, ge=1, description="Rows per page, clamped to LIST_MAX_LIMIT"),
+    filters: AttendanceFilter = Depends(attendance_filter),
+    session: Session = Depends(get_read_session),
+):
+    # Newest date first. Paging is keyset on (date, id), so a deep page is an index
+    # seek like the first one instead of an OFFSET scan.
+    limit = min(limit, settings.list_max_limit)
+    position = _decode_cursor(cursor) if cursor is not None else None
+    stmt = select(Attendance).where(*filters.clauses())
+    if isinstance(position, tuple):
+        stmt = stmt.where(tuple_(Attendance.date, Attendance.id) < position)
+    stmt = stmt.order_by(Attendance.date.desc(), Attendance.id.desc()).limit(limit + 1)
 
+    def read():
+        return session.exec(stmt).all()
 
-@router.post("/attendance")
-def create_attendance(payload: AttendanceCreate, session: Session = Depends(get_session)):
-    record = Attendance(
-        date=payload.date,
-        timestamp=payload.timestamp or datetime.now(ZoneInfo("Asia/Kolkata")).strftime("%H:%M:%S"),
-        subject=payload.subject,
-        professor=payload.professor,
-        status=payload.status,
+    if journal is None or isinstance(position, tuple):
+        rows = read()
+        return {
+            "items": rows[:limit],
+            "next_cursor": _encode_cursor(rows[limit - 1]) if len(rows) > limit else None,
+        }
+    # Unflushed rows lead the listing, with id null and pending true, and count against the limit.
+    served = position or 0
+    rows, entries = journal.read_consistent(read)
+    pending = [row for row in reversed(entries) if filters.matches(row)][served:served + limit + 1]
+    if len(pending) >= limit:
+        more = len(pending) > limit or bool(rows)
+        return {"items": pending[:limit], "next_cursor": _encode_cursor(served + limit) if more else None}
+    room = limit - len(pending)
+    return {
+        "items": [*pending, *rows[:room]],
+        "next_cursor": _encode_cursor(rows[room - 1]) if len(rows) > room else None,
+    }
+
+
+def _export_chunks(filters: AttendanceFilter, fmt: str) -> Iterator[bytes]:
+    # The response outlives the request's dependencies, so the stream opens its own session.
+    table = Attendance.__table__
+    stmt = select(*(table.c[name] for name in EXPORT_COLUMNS)).where(*filters.clauses()).order_by(table.c.id)
+    with contextmanager(get_read_session)() as session:
+        result = session.connection().execution_options(yield_per=EXPORT_CHUNK).execute(stmt)
+        if fmt == "csv":
+            yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+        for rows in result.partitions():
+            buffer = io.StringIO()
+            if fmt == "csv":
+                csv.writer(buffer).writerows(rows)
+            else:
+                for row in rows:
+                    buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n")
+            yield buffer.getvalue().encode()
+
+
+def _gzipped(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/attendance/export")
+def export_attendance(
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+    gzip: bool = Query(False, description="Compress the stream and name the file .gz"),
+    filters: AttendanceFilter = Depends(attendance_filter),
+):
+    # Rows come off a streaming cursor EXPORT_CHUNK at a time, so memory stays flat at any table size.
+    _drain_journal()
+    chunks = _export_chunks(filters, fmt)
+    filename = f"attendance.{fmt}"
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if gzip:
+        chunks, filename, media_type = _gzipped(chunks), filename + ".gz", "application/gzip"
+    return StreamingResponse(
+        chunks, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
+
+
+def _import_reports(spool, chunk_size: int | None, skip_rows: int) -> Iterator[dict]:
+    # Stepped from worker threads; owns the spooled body and its session until the last report.
+    with spool, contextmanager(get_session)() as session:
+        try:
+            yield from import_csv(session, io.TextIOWrapper(spool, encoding="utf-8-sig", newline=""), chunk_size, skip_rows)
+        finally:
+            _written()
+
+
+def _ndjson(first: dict, reports: Iterator[dict]) -> Iterator[str]:
+    yield json.dumps(first) + "\n"
+    for report in reports:
+        yield json.dumps(report) + "\n"
+
+
+def _final_report(reports: Iterator[dict]) -> dict:
+    for report in reports:
+        pass
+    return report
+
+
+@router.post("/attendance/import")
+async def import_attendance(
+    request: Request,
+    chunk_size: int | None = Query(None, ge=1, description="Rows per transaction (BULK_CHUNK_SIZE by default)"),
+    skip_rows: int = Query(0, ge=0, description="Data rows to skip, e.g. resume_skip_rows of a failed import"),
+    progress: bool = Query(False, description="Stream NDJSON progress reports, one per committed chunk"),
+):
+    """Import a CSV request body with the columns of /attendance/export (``id`` is ignored)."""
+    spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES)
+    async for part in request.stream():
+        spool.write(part)
+    spool.seek(0)
+    reports = _import_reports(spool, chunk_size, skip_rows)
+    try:
+        first = await run_in_threadpool(next, reports)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if progress:
+        return StreamingResponse(_ndjson(first, reports), media_type="application/x-ndjson")
+    if first.get("done"):
+        return first
+    return await run_in_threadpool(_final_report, reports)
+
+
+@router.post("/attendance")
+@session_endpoint
+def create_attendance(
+    payload: AttendanceCreate,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    session: Session = Depends(get_session),
+):
+    values = {
+        "date": payload.date,
+        "timestamp": payload.timestamp or datetime.now(ZoneInfo("Asia/Kolkata")).strftime("%H:%M:%S"),
+        "subject": payload.subject,
+        "professor": payload.professor,
+        "status": payload.status,
+        "count": 1,
+        **date_columns(payload.date),
+    }
+    if journal is not None:
+        entry = offload(journal.append, values, idempotency_key or uuid.uuid4().hex)
+        # The primary is untouched until the flush (which marks the replica dirty); only cached analytics change.
+        analytics_cache.invalidate()
+        return entry
+
+    record = Attendance(**values, idempotency_key=idempotency_key)
     session.add(record)
-    session.commit()
+    _track(session, rollup.row_deltas(record))
+    try:
+        session.commit()
+    except IntegrityError:
+        # Retried request: the unique index on idempotency_key already holds its row.
+        session.rollback()
+        if idempotency_key is None:
+            raise
+        return session.exec(select(Attendance).where(Attendance.idempotency_key == idempotency_key)).one()
+    _written()
     session.refresh(record)
     return record
 
 
 @router.post("/attendance/bulk")
-def bulk_create_attendance(payload: BulkQuickLogBatch, session: Session = Depends(get_session)):
-    inserted = 0
+@session_endpoint
+def bulk_create_attendance(
+    payload: BulkQuickLogBatch,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    session: Session = Depends(get_session),
+):
     now = datetime.now(ZoneInfo("Asia/Kolkata")).strftime("%H:%M:%S")
+    values: list[dict] = []
     for row in payload.rows:
         if row.present < 0 or row.absent < 0:
             continue
@@ -64,33 +478,54 @@ def bulk_create_attendance(payload: BulkQuickLogBatch, session: Session = Depend
             professor_name = row.professor
         if not professor_name:
             continue
-        for _ in range(row.present):
-            session.add(
-                Attendance(
-                    date=row.date,
-                    timestamp=now,
-                    subject=row.subject,
-                    professor=professor_name,
-                    status="Present",
-                )
-            )
-            inserted += 1
-        for _ in range(row.absent):
-            session.add(
-                Attendance(
-                    date=row.date,
-                    timestamp=now,
-                    subject=row.subject,
-                    professor=professor_name,
-                    status="Absent",
-                )
-            )
-            inserted += 1
-    session.commit()
-    return {"inserted": inserted}
+        for status, count in (("Present", row.present), ("Absent", row.absent)):
+            if count == 0:
+                continue
+            base = {
+                "date": row.date,
+                "timestamp": now,
+                "subject": row.subject,
+                "professor": professor_name,
+                "status": status,
+            }
+            if settings.weighted_rows:
+                values.append({**base, "count": count})
+            else:
+                values.extend({**base, "count": 1} for _ in range(count))
+
+    if idempotency_key is not None:
+        # Row i of a retried batch gets the same key as before, so rows (or whole chunks) that
+        # already landed are skipped and only the rest are inserted.
+        for i, v in enumerate(values):
+            v["idempotency_key"] = f"{idempotency_key}:{i}"
+
+    started = time.perf_counter()
+    pending = values
+    try:
+        if idempotency_key is not None:
+            pending = _unstored(session, values)
+        try:
+            stored, chunks = insert_rows(session, pending)
+        except IntegrityError:
+            if idempotency_key is None:
+                raise
+            # A concurrent retry stored part of the batch first; the chunks committed before the clash stay.
+            session.rollback()
+            pending = _unstored(session, values)
+            stored, chunks = insert_rows(session, pending)
+    finally:
+        _written()
+    return {
+        "inserted": sum(v["count"] for v in values),
+        "stored_rows": stored,
+        "already_stored": len(values) - len(pending),
+        "chunks": chunks,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
 
 
 @router.put("/attendance/{attendance_id}")
+@session_endpoint
 def update_attendance(
     attendance_id: int, payload: AttendanceUpdate, session: Session = Depends(get_session)
 ):
@@ -98,90 +533,247 @@ def update_attendance(
     if not row:
         raise HTTPException(status_code=404, detail="Entry not found")
     data = payload.model_dump(exclude_unset=True)
+    if "date" in data:
+        data.update(date_columns(data["date"]))
+    deltas = rollup.row_deltas(row, -1)
     for key, value in data.items():
         setattr(row, key, value)
+    deltas.update(rollup.row_deltas(row))
     session.add(row)
+    _track(session, deltas)
     session.commit()
+    _written()
     session.refresh(row)
     return row
 
 
 @router.delete("/attendance/{attendance_id}")
+@session_endpoint
 def delete_attendance(attendance_id: int, session: Session = Depends(get_session)):
     row = session.get(Attendance, attendance_id)
     if not row:
         raise HTTPException(status_code=404, detail="Entry not found")
     session.delete(row)
+    _track(session, rollup.row_deltas(row, -1))
     session.commit()
+    _written()
     return {"deleted": attendance_id}
 
 
 @router.delete("/attendance/by-date/{date_value}")
+@session_endpoint
 def delete_by_date(date_value: str, session: Session = Depends(get_session)):
+    _drain_journal()
     stmt = delete(Attendance).where(Attendance.date == date_value)
     result = session.exec(stmt)
+    if settings.use_rollup:
+        rollup.delete_date(session, date_value)
     session.commit()
+    _written()
     return {"deleted": result.rowcount, "date": date_value}
 
 
 @router.post("/manage/merge-professor")
+@session_endpoint
 def merge_professor_names(
     from_name: str = Query(..., description="Legacy name"),
     to_name: str = Query(..., description="Canonical name"),
     session: Session = Depends(get_session),
 ):
-    rows = session.exec(select(Attendance).where(Attendance.professor == from_name)).all()
-    for row in rows:
-        row.professor = to_name
-        session.add(row)
+    _drain_journal()
+    merged = aliases.rewrite(session, [(from_name, to_name)])
+    session.commit()
+    _written()
+    return {"merged_count": merged, "from": from_name, "to": to_name}
+
+
+@router.post("/manage/merge-professors")
+@session_endpoint
+def merge_professors(payload: ProfessorMergeBatch, session: Session = Depends(get_session)):
+    """Merge many professor names at once.
+
+    ``alias`` mode (default) writes one alias row per name and analytics
+    resolve it at query time; the attendance rows keep their stored name.
+    ``rewrite`` updates the rows themselves, one UPDATE per chunk of names.
+    """
+    pairs = [(pair.from_name, pair.to_name) for pair in payload.pairs]
+    if payload.mode == "rewrite":
+        _drain_journal()
+        result = {"mode": "rewrite", "rows_updated": aliases.rewrite(session, pairs)}
+    else:
+        result = {"mode": "alias", "aliases_changed": aliases.add_aliases(session, pairs)}
     session.commit()
-    return {"merged_count": len(rows), "from": from_name, "to": to_name}
+    _written()
+    return result
+
+
+@router.get("/manage/professor-aliases")
+@session_endpoint
+def list_professor_aliases(session: Session = Depends(get_session)):
+    return aliases.alias_map(session)
+
+
+@router.delete("/manage/professor-aliases/{alias}")
+@session_endpoint
+def delete_professor_alias(alias: str, session: Session = Depends(get_session)):
+    if not aliases.remove_alias(session, alias):
+        raise HTTPException(status_code=404, detail="Alias not found")
+    session.commit()
+    _written()
+    return {"deleted": alias}
 
 
 @router.get("/dashboard/summary")
-def get_dashboard_summary(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance).order_by(Attendance.date.asc())).all()
-    return dashboard_summary(rows, professors=PROFESSORS)
+@session_endpoint
+def get_dashboard_summary(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    return analytics_cache.respond(
+        request, lambda: dashboard_summary_from_counts(_load_counts(session, window), professors=PROFESSORS)
+    )
 
 @router.get("/simulator/subjects")
-def simulator_subjects(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance)).all()
-    return [calc_subject_stat(rows, professor) for professor in PROFESSORS]
+@session_endpoint
+def simulator_subjects(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    def build():
+        counts = _load_counts(session, window)
+        return [subject_stat_from_counts(counts, professor) for professor in PROFESSORS]
+
+    return analytics_cache.respond(request, build)
+
+BUNDLE_SECTIONS = ("summary", "simulator", "cumulative", "monthly")
+
+
+@router.get("/dashboard/bundle")
+@session_endpoint
+def dashboard_bundle(
+    request: Request,
+    sections: str | None = Query(None, description=f"Comma-separated subset of: {', '.join(BUNDLE_SECTIONS)}"),
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    # One grouped read feeds every page payload, so a page load costs one DB round trip.
+    wanted = [name.strip() for name in sections.split(",") if name.strip()] if sections else list(BUNDLE_SECTIONS)
+    unknown = [name for name in wanted if name not in BUNDLE_SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+
+    def build():
+        counts = _load_counts(session, window, day_subjects="monthly" in wanted)
+        builders = {
+            "summary": lambda: dashboard_summary_from_counts(counts, professors=PROFESSORS),
+            "simulator": lambda: [subject_stat_from_counts(counts, professor) for professor in PROFESSORS],
+            "cumulative": lambda: grouped_subjects_from_counts(counts),
+            "monthly": lambda: monthly_snapshots_from_counts(counts),
+        }
+        return {section: builders[section]() for section in BUNDLE_SECTIONS if section in wanted}
+
+    return analytics_cache.respond(request, build)
+
 
 @router.get("/professors/breakdown")
-def professors_breakdown(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance)).all()
-    return professor_breakdown(rows, professors=PROFESSORS)
+@session_endpoint
+def professors_breakdown(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    return analytics_cache.respond(
+        request, lambda: professor_breakdown_from_counts(_load_counts(session, window), professors=PROFESSORS)
+    )
 
 @router.get("/subjects/cumulative")
-def subjects_cumulative(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance)).all()
-    return calc_grouped_subjects(rows)
+@session_endpoint
+def subjects_cumulative(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    return analytics_cache.respond(request, lambda: grouped_subjects_from_counts(_load_counts(session, window)))
 
 @router.get("/insights/monthly")
-def insights_monthly(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance)).all()
-    return monthly_snapshots(rows)
+@session_endpoint
+def insights_monthly(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    return analytics_cache.respond(
+        request, lambda: monthly_snapshots_from_counts(_load_counts(session, window, day_subjects=True))
+    )
 
 
 @router.get("/insights/bunk-budget")
-def bunk_budget(session: Session = Depends(get_session)):
-    rows = session.exec(select(Attendance)).all()
-    summary = dashboard_summary(rows, professors=PROFESSORS)
-    table = []
-    for row in summary["subject_cards"]:
-        table.append(
-            {
-                "professor": row["professor"],
-                "percentage": row["percentage"],
-                "safe_to_skip": row["safe_to_skip"],
-                "need_to_attend": row["need_to_attend"],
-            }
-        )
-    return table
+@session_endpoint
+def bunk_budget(
+    request: Request,
+    window: AnalyticsWindow = Depends(analytics_window),
+    session: Session = Depends(get_read_session),
+):
+    def build():
+        summary = dashboard_summary_from_counts(_load_counts(session, window), professors=PROFESSORS)
+        table = []
+        for row in summary["subject_cards"]:
+            table.append(
+                {
+                    "professor": row["professor"],
+                    "percentage": row["percentage"],
+                    "safe_to_skip": row["safe_to_skip"],
+                    "need_to_attend": row["need_to_attend"],
+                }
+            )
+        return table
+
+    return analytics_cache.respond(request, build)
 
 
 @router.get("/meta/count")
-def db_count(session: Session = Depends(get_session)):
-    count = session.exec(select(func.count()).select_from(Attendance)).one()
-    return {"rows": count}
+@session_endpoint
+def db_count(session: Session = Depends(get_read_session)):
+    def read():
+        return session.exec(select(func.count(), func.coalesce(func.sum(Attendance.count), 0))).one()
+
+    if journal is None:
+        count, classes = read()
+        return {"rows": count, "classes": classes}
+    (count, classes), entries = journal.read_consistent(read)
+    return {
+        "rows": count + len(entries),
+        "classes": classes + sum(row["count"] for row in entries),
+        "pending": len(entries),
+    }
+
+
+@router.get("/meta/cache")
+def cache_stats():
+    return analytics_cache.stats()
+
+
+@router.post("/meta/replica/sync")
+def sync_replica():
+    if replica is None:
+        raise HTTPException(status_code=404, detail="No replica configured (REPLICA_PATH)")
+    return replica.sync()
+
+
+@router.post("/meta/journal/flush")
+def flush_journal():
+    if journal is None:
+        raise HTTPException(status_code=404, detail="No write-behind journal configured (WRITE_BEHIND_PATH)")
+    return {"flushed": journal.flush_all(), **journal.status()}
+
+
+@router.get("/meta/perf")
+def perf_stats():
+    return {
+        "enabled": settings.perf_timing,
+        "routes": perf_recorder.stats(),
+        "slow_query_ms": settings.slow_query_ms,
+        "slow_queries": perf_recorder.slow_queries(),
+    }
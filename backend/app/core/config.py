@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,6 +12,94 @@ class Settings(BaseSettings):
         default="sqlite:///./attendance_ultra.db",
         description="Uses existing SQLite DB by default for seamless continuity.",
     )
+    use_rollup: bool = Field(
+        default=False,
+        description="Read analytics from attendance_daily_rollup. Run rebuild_rollup.py once before enabling.",
+    )
+    analytics_cache_size: int = Field(
+        default=256,
+        description="Max cached analytics responses per process (LRU). 0 disables the cache.",
+    )
+    analytics_cache_ttl: float = Field(
+        default=60.0,
+        description="Seconds a cached response may be served; bounds staleness across serverless instances. 0 = no expiry.",
+    )
+    bulk_chunk_size: int = Field(
+        default=500,
+        description="Rows per executemany/commit for bulk inserts.",
+    )
+    weighted_rows: bool = Field(
+        default=True,
+        description="Store quick-log batches as one row per status with a count instead of one row per class.",
+    )
+    analytics_engine: Literal["sql", "numpy"] = Field(
+        default="sql",
+        description="sql: grouped query/rollup. numpy: in-process columnar snapshot reduced with bincount (needs numpy).",
+    )
+    async_db: bool = Field(
+        default=False,
+        description="Serve DB routes as async handlers on an async engine (aiosqlite for a local file; not available for libsql/Turso).",
+    )
+    async_database_url: str | None = Field(
+        default=None,
+        description="Explicit async SQLAlchemy URL; derived from DATABASE_URL when unset.",
+    )
+    db_pool_size: int | None = Field(
+        default=None,
+        description="Connection pool size (SQLAlchemy default when unset). Async mode can afford far more than the threadpool.",
+    )
+    db_max_overflow: int = Field(
+        default=10,
+        description="Connections allowed beyond DB_POOL_SIZE under bursts.",
+    )
+    replica_path: str | None = Field(
+        default=None,
+        description="Local SQLite file to serve GET routes from; writes still go to DATABASE_URL. Needs migrate_schema.py --change-log on the primary.",
+    )
+    replica_max_lag: float = Field(
+        default=30.0,
+        description="Seconds a replica read may be behind the primary before the read syncs first.",
+    )
+    replica_change_retention: int = Field(
+        default=100_000,
+        description="Newest attendance_changes entries kept on the primary after a sync (0 keeps all); a replica further behind re-copies the table.",
+    )
+    list_max_limit: int = Field(
+        default=200,
+        description="Largest page GET /attendance serves; bigger limits are clamped.",
+    )
+    write_behind_path: str | None = Field(
+        default=None,
+        description="Local SQLite journal for POST /attendance: writes are acknowledged once journaled and flushed to the primary in batches.",
+    )
+    write_behind_interval: float = Field(
+        default=1.0,
+        description="Seconds between write-behind flushes.",
+    )
+    write_behind_batch: int = Field(
+        default=500,
+        description="Journal entries per flush transaction.",
+    )
+    semester_starts: str = Field(
+        default="01-01,07-01",
+        description="Comma-separated MM-DD each semester starts on; a semester ends the day before the next starts. Resolves ?semester= on analytics routes.",
+    )
+    warm_up_on_first_request: bool = Field(
+        default=True,
+        description="Open a DB connection in the background when the first request arrives.",
+    )
+    perf_timing: bool = Field(
+        default=True,
+        description="Time each request (Server-Timing header, per-route p50/p95/p99 at /meta/perf).",
+    )
+    perf_window: int = Field(
+        default=1024,
+        description="Most recent requests per route kept for the /meta/perf percentiles.",
+    )
+    slow_query_ms: float = Field(
+        default=200.0,
+        description="Log statements slower than this (parameters redacted) and list them at /meta/perf. 0 disables.",
+    )
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from app.core.config import settings
+
+# Per-request state: {"phases": {name: seconds}, "stack": [(name, started_at)], "notes": {name: desc},
+# "sql": [statements, rows_fetched, seconds], "scope": asgi_scope}.
+# Sync routes run in a threadpool with a copy of the context; the dict itself is shared, so phases
+# recorded there are visible to the middleware.
+_request_state: ContextVar[dict | None] = ContextVar("request_perf", default=None)
+
+PERCENTILES = (50, 95, 99)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the enclosed wall time to ``name`` for the current request.
+
+    Phases are exclusive: a nested phase pauses the outer one, so the
+    Server-Timing entries add up to no more than the request total. Outside a
+    timed request this is a no-op.
+    """
+    state = _request_state.get()
+    if state is None:
+        yield
+        return
+    phases, stack = state["phases"], state["stack"]
+    now = time.perf_counter()
+    if stack:
+        outer, started = stack[-1]
+        phases[outer] = phases.get(outer, 0.0) + now - started
+    stack.append((name, now))
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _, started = stack.pop()
+        phases[name] = phases.get(name, 0.0) + now - started
+        if stack:
+            stack[-1] = (stack[-1][0], now)
+
+
+def note(name: str, desc: str) -> None:
+    """Attach a short description (e.g. ``cache;desc="hit"``) to the current request's Server-Timing."""
+    state = _request_state.get()
+    if state is not None:
+        state["notes"][name] = desc
+
+
+def record_statement(seconds: float, statements: int = 1) -> None:
+    """Count executed statements (called from the engine's cursor events)."""
+    state = _request_state.get()
+    if state is not None:
+        sql = state["sql"]
+        sql[0] += statements
+        sql[2] += seconds
+
+
+def record_rows(rows: int, seconds: float) -> None:
+    state = _request_state.get()
+    if state is not None:
+        sql = state["sql"]
+        sql[1] += rows
+        sql[2] += seconds
+
+
+def current_route() -> str | None:
+    state = _request_state.get()
+    return _route_key(state["scope"]) if state is not None else None
+
+
+def _percentile(ordered: list[float], pct: int) -> float:
+    # Nearest-rank on an already sorted window.
+    index = max(0, min(len(ordered) - 1, -(-pct * len(ordered) // 100) - 1))
+    return ordered[index]
+
+
+class RouteTimings:
+    """Rolling latency window and phase totals for one route."""
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.samples: deque[float] = deque(maxlen=window)
+        self.phase_totals: dict[str, float] = {}
+        self.sql_totals = [0, 0, 0.0]
+        self.max_statements = 0
+
+    def add(self, total: float, phases: dict[str, float], sql: list) -> None:
+        self.count += 1
+        self.samples.append(total)
+        for name, seconds in phases.items():
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + seconds
+        for i, value in enumerate(sql):
+            self.sql_totals[i] += value
+        self.max_statements = max(self.max_statements, sql[0])
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+        result = {"count": self.count, "window": len(ordered)}
+        for pct in PERCENTILES:
+            result[f"p{pct}_ms"] = round(_percentile(ordered, pct) * 1000, 2) if ordered else None
+        result["mean_phase_ms"] = {
+            name: round(seconds / self.count * 1000, 2) for name, seconds in sorted(self.phase_totals.items())
+        }
+        statements, rows, seconds = self.sql_totals
+        result["sql"] = {
+            "mean_statements": round(statements / self.count, 2),
+            "max_statements": self.max_statements,
+            "mean_rows": round(rows / self.count, 1),
+            "mean_db_ms": round(seconds / self.count * 1000, 2),
+        }
+        return result
+
+
+class PerfRecorder:
+    """Per-route rolling p50/p95/p99 over the last ``window`` requests.
+
+    Recording is an append to a bounded deque; percentiles are only sorted
+    out when ``stats()`` is read.
+    """
+
+    def __init__(self, window: int = 1024, slow_queries: int = 50) -> None:
+        self.window = window
+        self._routes: dict[str, RouteTimings] = {}
+        self._slow: deque[dict] = deque(maxlen=slow_queries)
+        self._lock = threading.Lock()
+
+    def record(self, route: str, total: float, phases: dict[str, float], sql: list | None = None) -> None:
+        with self._lock:
+            timings = self._routes.get(route)
+            if timings is None:
+                timings = self._routes[route] = RouteTimings(self.window)
+            timings.add(total, phases, sql or [0, 0, 0.0])
+
+    def record_slow_query(self, entry: dict) -> None:
+        with self._lock:
+            self._slow.append(entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {route: timings.summary() for route, timings in sorted(self._routes.items())}
+
+    def slow_queries(self) -> list[dict]:
+        with self._lock:
+            return list(self._slow)
+
+
+def _server_timing(phases: dict[str, float], notes: dict[str, str], sql: list, total: float) -> bytes:
+    parts = []
+    if sql[0]:
+        parts.append(f'sql;dur={sql[2] * 1000:.2f};desc="{sql[0]} statements, {sql[1]} rows"')
+    for name, seconds in phases.items():
+        desc = notes.pop(name, None)
+        parts.append(f"{name};dur={seconds * 1000:.2f}" + (f';desc="{desc}"' if desc else ""))
+    parts.extend(f'{name};desc="{desc}"' for name, desc in notes.items())
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+def _route_key(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else '<unmatched>'}"
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware: times each HTTP request, adds ``Server-Timing`` and records it per route.
+
+    The route key is the matched path template (``GET /attendance/{attendance_id}``),
+    so path parameters don't fan out into separate histograms.
+    """
+
+    def __init__(self, app, recorder: PerfRecorder) -> None:
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"phases": {}, "stack": [], "notes": {}, "sql": [0, 0, 0.0], "scope": scope}
+        token = _request_state.set(state)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                headers = list(message.get("headers", []))
+                timing = _server_timing(dict(state["phases"]), dict(state["notes"]), state["sql"], total)
+                headers.append((b"server-timing", timing))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_state.reset(token)
+            self.recorder.record(_route_key(scope), time.perf_counter() - started, state["phases"], state["sql"])
+
+
+perf_recorder = PerfRecorder(window=settings.perf_window)
@@ -1,8 +1,20 @@
+import functools
+import inspect
+import logging
 import os
+import threading
+import time
+
+from fastapi import Depends
+
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 from app.core.config import settings
+from app.core import perf
 
-def _build_engine():
+slow_query_log = logging.getLogger("app.db.slow_query")
+
+def _database_url() -> str:
     # FORCE Python to look at Vercel's environment variables first.
     # If it's not on Vercel, it safely falls back to your local settings.
     db_url = os.getenv("DATABASE_URL", settings.database_url)
@@ -12,7 +24,29 @@ def _build_engine():
         db_url = db_url.replace("libsql://", "sqlite+libsql://", 1)
     elif db_url.startswith("https://"):
         db_url = db_url.replace("https://", "sqlite+libsql://", 1)
+    return db_url
+
+
+def _async_database_url(db_url: str) -> str:
+    if settings.async_database_url:
+        return settings.async_database_url
+    if db_url.startswith("sqlite:///"):
+        return db_url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+    if db_url.startswith("sqlite+libsql://"):
+        # sqlalchemy-libsql only ships a sync dialect; there is no async driver to derive for Turso.
+        raise RuntimeError(
+            "ASYNC_DB is not supported with a libsql/Turso DATABASE_URL: sqlalchemy-libsql has no async dialect. "
+            "Set ASYNC_DB=false, or point ASYNC_DATABASE_URL at an async driver for this database."
+        )
+    raise RuntimeError(f"No async driver known for {db_url.split(':', 1)[0]}; set ASYNC_DATABASE_URL.")
+
+
+def check_async_driver() -> None:
+    """Raise at startup, not on the first request, when ASYNC_DB has no async driver for DATABASE_URL."""
+    _async_database_url(_database_url())
 
+
+def _engine_kwargs(db_url: str) -> dict:
     connect_args = {}
     
     # Auto-inject the Auth Token strictly through connection arguments to prevent 401s
@@ -23,15 +57,245 @@ def _build_engine():
     # Only apply local threading rules if it's actually a local offline file
     if db_url.startswith("sqlite:///"):
         connect_args["check_same_thread"] = False
-        
-    return create_engine(db_url, connect_args=connect_args, echo=False)
 
+    kwargs = {"connect_args": connect_args, "echo": False}
+    if settings.db_pool_size is not None:
+        kwargs.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    return kwargs
+
+
+def _build_engine():
+    db_url = _database_url()
+    return create_engine(db_url, **_engine_kwargs(db_url))
+
+
+def _build_async_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    db_url = _async_database_url(_database_url())
+    return create_async_engine(db_url, **_engine_kwargs(db_url))
+
+
+class _CountingCursor:
+    """DBAPI cursor proxy that reports rows fetched and fetch time.
+
+    SQLite does most of a query's work while rows are stepped through, not in
+    ``execute()``, so fetch time counts as DB time too.
+    """
+
+    __slots__ = ("_cursor",)
+
+    def __init__(self, cursor) -> None:
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        perf.record_rows(0 if row is None else 1, time.perf_counter() - started)
+        return row
+
+    def fetchmany(self, *args):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(*args)
+        perf.record_rows(len(rows), time.perf_counter() - started)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        perf.record_rows(len(rows), time.perf_counter() - started)
+        return rows
+
+
+def _redact(parameters, executemany: bool) -> str:
+    # Keep the shape (names and types) for debugging, never the values.
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: <{type(v).__name__}>" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(f"<{type(v).__name__}>" for v in parameters or ()) + ")"
+
+
+def instrument(engine) -> None:
+    """Count statements, fetched rows and DB time per request and log slow queries.
+
+    Numbers land in the current request's perf state (Server-Timing ``sql``
+    entry and /meta/perf); outside a timed request only the slow-query log applies.
+    """
+
+    # The start time rides on the execution context, so a statement that raises
+    # (after_cursor_execute never fires) leaves nothing behind on the connection.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._perf_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_perf_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        # executemany runs the statement once per parameter set; count each so per-row loops stay visible.
+        perf.record_statement(elapsed, len(parameters) if executemany else 1)
+        # Result rows are fetched from context.cursor after this hook, so the proxy sees every fetch.
+        if context is not None and cursor.description is not None:
+            context.cursor = _CountingCursor(cursor)
+        if settings.slow_query_ms and elapsed * 1000 >= settings.slow_query_ms:
+            entry = {
+                "ms": round(elapsed * 1000, 2),
+                "route": perf.current_route(),
+                "statement": " ".join(statement.split())[:500],
+                "parameters": _redact(parameters, executemany),
+            }
+            perf.perf_recorder.record_slow_query(entry)
+            slow_query_log.warning("slow query %.1fms on %s: %s %s", entry["ms"], entry["route"], entry["statement"], entry["parameters"])
+
+
+# Engines are built on first use, not at import: a cold start only pays for the
+# driver import and dialect setup once a request actually needs the database.
+_engines: dict[str, object] = {}
+_engines_lock = threading.Lock()
+
+
+def _engine(kind: str, build):
+    engine = _engines.get(kind)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(kind)
+            if engine is None:
+                engine = build()
+                if settings.perf_timing:
+                    instrument(getattr(engine, "sync_engine", engine))
+                _engines[kind] = engine
+    return engine
+
+
+def get_engine():
+    return _engine("sync", _build_engine)
+
+
+def get_async_engine():
+    """Async engine for ASYNC_DB; its sync_engine carries the same instrumentation."""
+    return _engine("async", _build_async_engine)
+
+
+def __getattr__(name: str):
+    # Keeps `from app.db.engine import engine` working for scripts, lazily.
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine() if settings.async_db else None
+    raise AttributeError(name)
+
+
+def warm_up() -> None:
+    """Build the sync engine and open one pooled connection (driver import, TLS handshake to Turso)."""
+    with get_engine().connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
+async def warm_up_async() -> None:
+    async with get_async_engine().connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
 
-engine = _build_engine()
 
 def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
 
 def get_session():
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    with Session(get_engine()) as session:
+        yield session
+
+
+async def get_async_session():
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+def get_read_session():
+    """Session for GET routes: the local replica when REPLICA_PATH is set, else the primary."""
+    if not settings.replica_path:
+        yield from get_session()
+        return
+    from app.db.replica import replica
+
+    replica.ensure_fresh()
+    with Session(replica.engine, info={"replica": True}) as session:
+        yield session
+
+
+async def get_async_read_session():
+    if not settings.replica_path:
+        async for session in get_async_session():
+            yield session
+        return
+    from fastapi.concurrency import run_in_threadpool
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.db.replica import replica
+
+    # Syncing talks to the primary through the sync engine; keep it off the event loop.
+    await run_in_threadpool(replica.ensure_fresh)
+    async with AsyncSession(replica.async_engine, expire_on_commit=False, info={"replica": True}) as session:
+        yield session
+
+
+def offload(fn, *args):
+    """Call ``fn`` for blocking I/O that does not go through the handler's session.
+
+    Under ASYNC_DB a ``session_endpoint`` handler runs on the event-loop thread
+    (inside ``run_sync``), so such calls (the write-behind journal, a flush to
+    the primary) are handed to the threadpool and awaited through SQLAlchemy's
+    greenlet bridge, like ``get_async_read_session`` does for replica syncs.
+    Anywhere else ``fn`` simply runs inline.
+    """
+    if settings.async_db:
+        from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+        if in_greenlet():
+            from fastapi.concurrency import run_in_threadpool
+
+            return await_only(run_in_threadpool(fn, *args))
+    return fn(*args)
+
+
+def session_endpoint(handler):
+    """Serve a ``session``-taking sync handler from either engine, per ASYNC_DB.
+
+    With the sync engine the handler is returned unchanged and FastAPI runs it
+    in its threadpool. With ASYNC_DB the route becomes ``async def``: it gets
+    an ``AsyncSession`` and runs the handler body through ``run_sync``, so
+    every DB round trip awaits the driver on the event loop instead of
+    holding a worker thread. Handlers stay written once, against ``Session``.
+    """
+    if not settings.async_db:
+        return handler
+
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    signature = inspect.signature(handler)
+    async_dependency = {get_session: get_async_session, get_read_session: get_async_read_session}[
+        signature.parameters["session"].default.dependency
+    ]
+
+    @functools.wraps(handler)
+    async def endpoint(*args, **kwargs):
+        session = kwargs.pop("session")
+        return await session.run_sync(lambda sync_session: handler(*args, session=sync_session, **kwargs))
+
+    endpoint.__signature__ = signature.replace(
+        parameters=[
+            param.replace(annotation=AsyncSession, default=Depends(async_dependency)) if name == "session" else param
+            for name, param in signature.parameters.items()
+        ]
+    )
+    return endpoint
\ No newline at end of file
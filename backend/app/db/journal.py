@@ -0,0 +1,243 @@
+"""Write-behind journal for single attendance writes (WRITE_BEHIND_PATH).
+
+POST /attendance appends the row to a local SQLite file and answers as soon
+as that insert is durable (WAL, ``synchronous=FULL``), without a round trip
+to the primary. A background thread flushes the journal every
+WRITE_BEHIND_INTERVAL seconds, WRITE_BEHIND_BATCH entries per transaction,
+through the same executemany path as /attendance/bulk.
+
+Every entry carries an idempotency key that is stored on the primary row
+(``attendance.idempotency_key``, unique). The flusher drops keys the primary
+already has before inserting, so a flush that committed but died before
+marking its entries never creates a second row. Flushed entries stay in the
+journal as tombstones for KEEP_FLUSHED seconds, so a client retrying the
+same POST is answered from the journal instead of being queued again.
+
+Reads include unflushed entries: ``read_consistent()`` pairs a primary read
+with ``pending()`` and retries under the flush lock if a flush landed in
+between, so an entry is never counted twice or missed. That check is per
+process, so the journal is meant for a single long-running server.
+"""
+
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, create_engine, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, delete, func, select, update
+
+from app.core.config import settings
+from app.db.engine import get_engine, offload
+from app.models.attendance import Attendance
+
+log = logging.getLogger("app.db.journal")
+
+# Kept out of SQLModel.metadata so init_db() never creates it on the primary.
+journal_entries = Table(
+    "attendance_journal",
+    MetaData(),
+    Column("seq", Integer, primary_key=True),
+    Column("idempotency_key", String, nullable=False, unique=True),
+    Column("payload", String, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("flushed_at", Float, index=True),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("last_error", String),
+)
+
+# How long flushed keys are remembered for retried POSTs.
+KEEP_FLUSHED = 24 * 3600
+# Keys per IN (...) lookup on the primary; stays well under SQLite's bound-parameter limit.
+KEY_CHUNK = 500
+
+
+class WriteJournal:
+    def __init__(self, path: str, interval: float, batch: int) -> None:
+        self.path = path
+        self.interval = interval
+        self.batch = max(batch, 1)
+        # Bumped after every flush; `flushing` covers the window in which rows exist on both sides.
+        self.generation = 0
+        self.flushing = False
+        self.flushed = 0
+        self.flushed_at: float | None = None
+        self.last_error: str | None = None
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+
+                    @event.listens_for(engine, "connect")
+                    def _durable(dbapi_connection, _record):
+                        cursor = dbapi_connection.cursor()
+                        cursor.execute("PRAGMA journal_mode=WAL")
+                        cursor.execute("PRAGMA synchronous=FULL")
+                        cursor.close()
+
+                    journal_entries.create(engine, checkfirst=True)
+                    self._engine = engine
+                    # Entries left by a previous process start flushing as soon as the journal is opened.
+                    threading.Thread(target=self._run, name="write-behind", daemon=True).start()
+        return self._engine
+
+    def append(self, values: dict, key: str) -> dict:
+        """Journal one attendance row. A key that is already journaled keeps its first payload.
+
+        A retry that arrives after its entry was flushed gets the primary row, id included.
+        """
+        with Session(self.engine) as session:
+            stmt = sqlite_insert(journal_entries).values(
+                idempotency_key=key, payload=json.dumps(values), created_at=time.time(), attempts=0
+            )
+            session.connection().execute(stmt.on_conflict_do_nothing(index_elements=["idempotency_key"]))
+            session.commit()
+            payload, flushed_at = session.connection().execute(
+                select(journal_entries.c.payload, journal_entries.c.flushed_at).where(
+                    journal_entries.c.idempotency_key == key
+                )
+            ).one()
+        if flushed_at is not None:
+            with Session(get_engine()) as primary:
+                row = primary.exec(select(Attendance).where(Attendance.idempotency_key == key)).first()
+            if row is not None:
+                return {**row.model_dump(), "pending": False}
+        return {**json.loads(payload), "id": None, "idempotency_key": key, "pending": flushed_at is None}
+
+    def pending(self) -> list[dict]:
+        """Unflushed rows, oldest first, shaped like ``attendance`` rows with ``id`` None."""
+        with Session(self.engine) as session:
+            rows = session.connection().execute(
+                select(journal_entries.c.idempotency_key, journal_entries.c.payload)
+                .where(journal_entries.c.flushed_at.is_(None))
+                .order_by(journal_entries.c.seq)
+            ).all()
+        return [{**json.loads(payload), "id": None, "idempotency_key": key, "pending": True} for key, payload in rows]
+
+    def read_consistent(self, read):
+        """Return ``(read(), pending())`` with no flush landing in between.
+
+        ``read`` runs on the caller's session; the journal's own I/O goes through
+        ``offload`` so an ASYNC_DB handler never blocks the event loop on it.
+        """
+        generation = self.generation
+        if not self.flushing:
+            result = read()
+            entries = offload(self.pending)
+            if not self.flushing and self.generation == generation:
+                return result, entries
+        # A plain Lock may be released by another thread than the one that acquired it.
+        offload(self._flush_lock.acquire)
+        try:
+            return read(), offload(self.pending)
+        finally:
+            self._flush_lock.release()
+
+    def flush(self) -> int:
+        """Push the oldest batch to the primary. Returns the number of entries cleared."""
+        from app.services.ingest import insert_rows
+
+        with self._flush_lock:
+            with Session(self.engine) as local:
+                entries = local.connection().execute(
+                    select(journal_entries.c.seq, journal_entries.c.idempotency_key, journal_entries.c.payload)
+                    .where(journal_entries.c.flushed_at.is_(None))
+                    .order_by(journal_entries.c.seq)
+                    .limit(self.batch)
+                ).all()
+            if not entries:
+                return 0
+            seqs = [seq for seq, _, _ in entries]
+            keys = [key for _, key, _ in entries]
+            try:
+                with Session(get_engine()) as primary:
+                    landed: set[str] = set()
+                    for start in range(0, len(keys), KEY_CHUNK):
+                        chunk = keys[start:start + KEY_CHUNK]
+                        landed.update(
+                            primary.exec(select(Attendance.idempotency_key).where(Attendance.idempotency_key.in_(chunk)))
+                        )
+                    rows = [{**json.loads(payload), "idempotency_key": key} for _, key, payload in entries if key not in landed]
+                    self.flushing = True
+                    if rows:
+                        insert_rows(primary, rows, chunk_size=len(rows))
+                self._after_flush()
+                now = time.time()
+                with Session(self.engine) as local:
+                    local.exec(update(journal_entries).where(journal_entries.c.seq.in_(seqs)).values(flushed_at=now))
+                    local.exec(delete(journal_entries).where(journal_entries.c.flushed_at < now - KEEP_FLUSHED))
+                    local.commit()
+            except Exception as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                with Session(self.engine) as local:
+                    local.exec(
+                        update(journal_entries)
+                        .where(journal_entries.c.seq.in_(seqs))
+                        .values(attempts=journal_entries.c.attempts + 1, last_error=self.last_error)
+                    )
+                    local.commit()
+                raise
+            finally:
+                self.generation += 1
+                self.flushing = False
+            self.flushed += len(rows)
+            self.flushed_at = now
+            self.last_error = None
+            return len(entries)
+
+    def flush_all(self) -> int:
+        """Flush until the journal is empty (used before writes that touch existing rows)."""
+        cleared = 0
+        while flushed := self.flush():
+            cleared += flushed
+        return cleared
+
+    def _after_flush(self) -> None:
+        # Runs before the entries are marked flushed, so a replica read never finds a row on neither side.
+        from app.db.replica import replica
+        from app.services.cache import analytics_cache
+
+        analytics_cache.invalidate()
+        if replica is not None:
+            replica.mark_dirty()
+            try:
+                replica.sync()
+            except Exception as exc:
+                replica.last_error = f"{type(exc).__name__}: {exc}"
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                while self.flush() == self.batch:
+                    pass
+            except Exception:
+                log.warning("write-behind flush failed; retrying in %.1fs", self.interval, exc_info=True)
+
+    def status(self) -> dict:
+        with Session(self.engine) as session:
+            pending, oldest = session.connection().execute(
+                select(func.count(), func.min(journal_entries.c.created_at)).where(journal_entries.c.flushed_at.is_(None))
+            ).one()
+        return {
+            "path": self.path,
+            "pending": pending,
+            "oldest_age_seconds": round(time.time() - oldest, 1) if oldest is not None else None,
+            "flushed": self.flushed,
+            "flushed_at": self.flushed_at,
+            "last_error": self.last_error,
+        }
+
+
+journal = (
+    WriteJournal(settings.write_behind_path, settings.write_behind_interval, settings.write_behind_batch)
+    if settings.write_behind_path
+    else None
+)
@@ -0,0 +1,127 @@
+"""Idempotent schema migrations for databases created before a column or table existed.
+
+Each step inspects the live schema first, so running the whole list against a
+database that is already up to date is a no-op. Works for local SQLite and
+Turso (libsql speaks the same dialect).
+"""
+
+from sqlalchemy import Engine, inspect, text
+from sqlmodel import Session, func, select
+
+from app.models.attendance import Attendance, AttendanceChange, AttendanceRollup, ProfessorAlias, date_columns
+
+
+def _columns(engine: Engine, table: str) -> set[str]:
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def add_count_column(engine: Engine) -> bool:
+    if "count" in _columns(engine, "attendance"):
+        return False
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE attendance ADD COLUMN count INTEGER NOT NULL DEFAULT 1"))
+    return True
+
+
+def create_alias_table(engine: Engine) -> bool:
+    if inspect(engine).has_table(ProfessorAlias.__tablename__):
+        return False
+    ProfessorAlias.__table__.create(engine)
+    return True
+
+
+def add_date_columns(engine: Engine) -> list[str]:
+    existing = _columns(engine, "attendance")
+    added = [name for name in ("day_ordinal",) if name not in existing]
+    with engine.begin() as conn:
+        for name in added:
+            conn.execute(text(f"ALTER TABLE attendance ADD COLUMN {name} INTEGER"))
+    return added
+
+
+def add_idempotency_column(engine: Engine) -> bool:
+    if "idempotency_key" in _columns(engine, "attendance"):
+        return False
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE attendance ADD COLUMN idempotency_key VARCHAR"))
+    return True
+
+
+def backfill_date_columns(engine: Engine) -> int:
+    """Fill day_ordinal for rows written before the column existed.
+
+    Parses each distinct date once and updates by date, so the work scales
+    with the number of days rather than rows. Returns the number of dates filled.
+    """
+    with Session(engine) as session:
+        pending = session.exec(
+            select(Attendance.date).where(Attendance.day_ordinal.is_(None)).distinct()
+        ).all()
+        params = [{"date": value, **date_columns(value)} for value in pending]
+        params = [p for p in params if p["day_ordinal"] is not None]
+        if params:
+            session.connection().execute(
+                text(
+                    "UPDATE attendance SET day_ordinal = :day_ordinal WHERE date = :date AND day_ordinal IS NULL"
+                ),
+                params,
+            )
+            session.commit()
+        return len(params)
+
+
+def create_indexes(engine: Engine) -> list[str]:
+    """Create any index declared on the models that the database does not have yet."""
+    created: list[str] = []
+    for table in (Attendance.__table__, AttendanceRollup.__table__):
+        if not inspect(engine).has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                index.create(engine, checkfirst=True)
+                created.append(index.name)
+    return created
+
+
+CHANGE_TRIGGERS = {
+    "attendance_changes_insert": "AFTER INSERT ON attendance BEGIN INSERT INTO attendance_changes (row_id) VALUES (NEW.id); END",
+    "attendance_changes_update": "AFTER UPDATE ON attendance BEGIN INSERT INTO attendance_changes (row_id) VALUES (NEW.id); END",
+    "attendance_changes_delete": "AFTER DELETE ON attendance BEGIN INSERT INTO attendance_changes (row_id) VALUES (OLD.id); END",
+}
+
+
+def create_change_log(engine: Engine) -> list[str]:
+    """Create attendance_changes and the triggers that fill it. Returns the triggers created."""
+    AttendanceChange.__table__.create(engine, checkfirst=True)
+    with engine.begin() as conn:
+        existing = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+        created = [name for name in CHANGE_TRIGGERS if name not in existing]
+        for name in created:
+            conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {CHANGE_TRIGGERS[name]}"))
+    return created
+
+
+def collapse_duplicates(engine: Engine) -> int:
+    """Fold identical (date, timestamp, subject, professor, status) rows into one weighted row.
+
+    The lowest id of each group keeps the summed count; the rest are deleted.
+    Returns the number of rows removed.
+    """
+    key = (Attendance.date, Attendance.timestamp, Attendance.subject, Attendance.professor, Attendance.status)
+    with Session(engine) as session:
+        groups = session.exec(
+            select(func.min(Attendance.id), func.sum(Attendance.count), func.count())
+            .group_by(*key)
+            .having(func.count() > 1)
+        ).all()
+        if not groups:
+            return 0
+        session.connection().execute(
+            text("UPDATE attendance SET count = :count WHERE id = :id"),
+            [{"id": keep_id, "count": total} for keep_id, total, _ in groups],
+        )
+        keep_ids = select(func.min(Attendance.id)).group_by(*key)
+        session.connection().execute(Attendance.__table__.delete().where(Attendance.id.not_in(keep_ids)))
+        session.commit()
+        return sum(rows - 1 for _, _, rows in groups)
@@ -0,0 +1,252 @@
+"""Local SQLite read replica of the primary database (REPLICA_PATH).
+
+Writes always go to the primary. Reads that only need to be eventually
+consistent open their session on a local file instead, which keeps a copy of
+``attendance`` and ``professor_aliases`` plus its own ``attendance_daily_rollup``.
+
+Sync is incremental: triggers on the primary log every touched row id in
+``attendance_changes`` (``migrate_schema.py --change-log``). The replica
+remembers the last ``seq`` it applied, fetches the current state of each
+changed id, replaces its copy (a missing id means the row was deleted) and
+moves its rollup by the difference. The first sync copies the table in id
+order and rebuilds the rollup.
+
+After applying changes a replica prunes the log down to the newest
+REPLICA_CHANGE_RETENTION entries. A replica that was further behind finds a
+gap before its next ``seq`` and falls back to a full copy.
+
+A read syncs first when this instance has written since the last sync
+(read-your-writes) or when the replica is older than REPLICA_MAX_LAG. If the
+primary cannot be reached, reads are served from the last good copy and the
+error shows up in /health.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, create_engine, inspect, text
+from sqlmodel import Session, delete, func, insert, select
+
+from app.core.config import settings
+from app.db.engine import get_engine
+from app.db.migrations import CHANGE_TRIGGERS
+from app.models.attendance import Attendance, AttendanceChange, AttendanceRollup, ProfessorAlias
+from app.services import rollup
+
+# Kept out of SQLModel.metadata so init_db() never creates it on the primary.
+replica_state = Table(
+    "replica_state",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("last_seq", Integer, nullable=False),
+    Column("synced_at", Float, nullable=False),
+)
+
+COPY_CHUNK = 5000
+# Ids per IN (...) lookup; stays well under SQLite's bound-parameter limit.
+ID_CHUNK = 500
+
+
+def _deltas(rows: list[dict], sign: int) -> Counter:
+    # Plain dicts: a Row's .count is the tuple method, not the column.
+    deltas: Counter = Counter()
+    for row in rows:
+        deltas[(row["date"], row["professor"], row["subject"], row["status"])] += sign * row["count"]
+    return deltas
+
+
+def _chunked(values: list, size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _missing_change_log(primary: Session) -> list[str]:
+    # init_db() creates attendance_changes without its triggers, and a log nothing writes to
+    # would leave the replica silently stale, so the triggers are checked too.
+    present = set(
+        primary.connection().execute(
+            text("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        ).scalars()
+    )
+    return [name for name in (AttendanceChange.__tablename__, *CHANGE_TRIGGERS) if name not in present]
+
+
+class Replica:
+    def __init__(self, path: str, max_lag: float, retention: int = 0) -> None:
+        self.path = path
+        self.max_lag = max_lag
+        self.retention = retention
+        self.last_seq: int | None = None
+        self.synced_at: float | None = None
+        self.last_error: str | None = None
+        self.dirty = True
+        self._engine = None
+        self._async_engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+            local = inspect(self._engine)
+            if local.has_table(Attendance.__tablename__) and {
+                column["name"] for column in local.get_columns(Attendance.__tablename__)
+            } != set(Attendance.__table__.columns.keys()):
+                # The replica is only a cache: after a schema change start over with a full copy.
+                for table in (Attendance.__table__, replica_state):
+                    table.drop(self._engine)
+            for table in (Attendance.__table__, AttendanceRollup.__table__, ProfessorAlias.__table__, replica_state):
+                table.create(self._engine, checkfirst=True)
+            with Session(self._engine) as session:
+                state = session.exec(select(replica_state.c.last_seq, replica_state.c.synced_at)).first()
+            if state is not None:
+                self.last_seq, self.synced_at = state
+        return self._engine
+
+    @property
+    def async_engine(self):
+        if self._async_engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            self.engine  # creates the schema
+            self._async_engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+        return self._async_engine
+
+    def mark_dirty(self) -> None:
+        """Called after a write on this instance so the next read picks it up."""
+        self.dirty = True
+
+    def ensure_fresh(self) -> None:
+        if not (self.dirty or self.synced_at is None or time.time() - self.synced_at > self.max_lag):
+            return
+        try:
+            self.sync()
+        except Exception as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if self.synced_at is None:
+                raise
+
+    def sync(self) -> dict:
+        """Bring the replica up to the primary's latest change. Returns what was applied."""
+        with self._lock:
+            started = time.perf_counter()
+            self.dirty = False
+            replica_engine = self.engine
+            with Session(get_engine()) as primary, Session(replica_engine) as local:
+                missing = _missing_change_log(primary)
+                if missing:
+                    raise RuntimeError(
+                        f"Primary change log is incomplete (missing {', '.join(missing)}); "
+                        "run `python migrate_schema.py --change-log`."
+                    )
+                if self.last_seq is None:
+                    applied = self._copy_all(primary, local)
+                else:
+                    applied = self._apply_changes(primary, local)
+                if applied and self.retention:
+                    self._prune_change_log(primary)
+                aliases_changed = self._copy_aliases(primary, local)
+            self.last_error = None
+            if applied or aliases_changed:
+                from app.services.cache import analytics_cache
+
+                analytics_cache.invalidate()
+            return {"applied": applied, "last_seq": self.last_seq, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def _save_state(self, local: Session, last_seq: int) -> None:
+        now = time.time()
+        local.exec(delete(replica_state))
+        local.exec(insert(replica_state).values(id=1, last_seq=last_seq, synced_at=now))
+        local.commit()
+        self.last_seq, self.synced_at = last_seq, now
+
+    def _copy_aliases(self, primary: Session, local: Session) -> bool:
+        # A handful of rows with no change log: compared whole on every sync. Returns whether they changed.
+        rows = dict(primary.exec(select(ProfessorAlias.alias, ProfessorAlias.canonical)).all())
+        if rows == dict(local.exec(select(ProfessorAlias.alias, ProfessorAlias.canonical)).all()):
+            return False
+        local.exec(delete(ProfessorAlias))
+        if rows:
+            local.exec(
+                insert(ProfessorAlias),
+                params=[{"alias": alias, "canonical": canonical} for alias, canonical in rows.items()],
+            )
+        local.commit()
+        return True
+
+    def _copy_all(self, primary: Session, local: Session) -> int:
+        # Read the head first: changes made during the copy are replayed next time, which is idempotent.
+        head = primary.exec(select(func.coalesce(func.max(AttendanceChange.seq), 0))).one()
+        local.exec(delete(Attendance))
+        table = Attendance.__table__
+        copied, last_id = 0, 0
+        while True:
+            rows = primary.connection().execute(
+                select(table).where(table.c.id > last_id).order_by(table.c.id).limit(COPY_CHUNK)
+            ).all()
+            if not rows:
+                break
+            local.exec(insert(table), params=[dict(row._mapping) for row in rows])
+            copied += len(rows)
+            last_id = rows[-1].id
+        # rebuild() checks the rollup table on its own connection, so release the write lock first.
+        local.commit()
+        rollup.rebuild(local)
+        self._save_state(local, head)
+        return copied
+
+    def _apply_changes(self, primary: Session, local: Session) -> int:
+        table = Attendance.__table__
+        applied = 0
+        while True:
+            changes = primary.exec(
+                select(AttendanceChange.seq, AttendanceChange.row_id)
+                .where(AttendanceChange.seq > self.last_seq)
+                .order_by(AttendanceChange.seq)
+                .limit(COPY_CHUNK)
+            ).all()
+            if not changes:
+                self._save_state(local, self.last_seq)
+                return applied
+            if changes[0][0] > self.last_seq + 1:
+                # seq has no gaps except where the log was pruned: entries this replica never saw are gone.
+                return self._copy_all(primary, local)
+            ids = sorted({row_id for _, row_id in changes})
+            deltas: Counter = Counter()
+            for chunk in _chunked(ids, ID_CHUNK):
+                lookup = select(table).where(table.c.id.in_(chunk))
+                current = [dict(row._mapping) for row in primary.connection().execute(lookup)]
+                previous = [dict(row._mapping) for row in local.connection().execute(lookup)]
+                deltas.update(_deltas(previous, -1))
+                deltas.update(_deltas(current, 1))
+                local.exec(delete(table).where(table.c.id.in_(chunk)))
+                if current:
+                    local.exec(insert(table), params=current)
+            rollup.apply_deltas(local, deltas)
+            applied += len(ids)
+            self._save_state(local, changes[-1][0])
+
+    def _prune_change_log(self, primary: Session) -> None:
+        # The newest entry always survives, so seq keeps counting up from it.
+        head = primary.exec(select(func.max(AttendanceChange.seq))).one()
+        if head is not None and head > self.retention:
+            primary.exec(delete(AttendanceChange).where(AttendanceChange.seq <= head - self.retention))
+            primary.commit()
+
+    def status(self) -> dict:
+        return {
+            "path": self.path,
+            "last_seq": self.last_seq,
+            "synced_at": self.synced_at,
+            "lag_seconds": round(time.time() - self.synced_at, 1) if self.synced_at is not None else None,
+            "pending_local_write": self.dirty,
+            "last_error": self.last_error,
+        }
+
+
+replica = (
+    Replica(settings.replica_path, settings.replica_max_lag, settings.replica_change_retention)
+    if settings.replica_path
+    else None
+)
@@ -1,8 +1,51 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
 from app.core.config import settings
+from app.core.perf import TimingMiddleware, perf_recorder
+from app.db import engine as db
+
+
+warm_up_log = logging.getLogger("app.warm_up")
+
+
+def _log_warm_up_failure(task: asyncio.Future) -> None:
+    # Nothing awaits the warm-up; retrieve its exception here so it is logged instead of lost.
+    if not task.cancelled() and task.exception() is not None:
+        warm_up_log.warning("background DB warm-up failed", exc_info=task.exception())
+
+
+class WarmUpMiddleware:
+    """On the first request only, open a DB connection in the background.
+
+    The engine is lazy, so a cold start doesn't pay for it until needed;
+    this overlaps the driver import and connection handshake with the first
+    request (often a /health ping) instead of serializing them in front of
+    the first query. Later requests skip straight through.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.warmed = False
+
+    async def __call__(self, scope, receive, send):
+        if not self.warmed and scope["type"] == "http":
+            self.warmed = True
+            loop = asyncio.get_running_loop()
+            if settings.async_db:
+                self.task = loop.create_task(db.warm_up_async())
+            else:
+                self.task = loop.run_in_executor(None, db.warm_up)
+            self.task.add_done_callback(_log_warm_up_failure)
+        await self.app(scope, receive, send)
+
+
+if settings.async_db:
+    db.check_async_driver()
 
 app = FastAPI(title=settings.app_name)
 
@@ -12,8 +55,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+if settings.warm_up_on_first_request:
+    app.add_middleware(WarmUpMiddleware)
+
+# Added last so it is outermost and its total covers CORS handling too.
+if settings.perf_timing:
+    app.add_middleware(TimingMiddleware, recorder=perf_recorder)
+
 import os
 
 # NOTE: We do NOT use @app.on_event("startup") to run init_db() here.
@@ -1,14 +1,87 @@
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class Attendance(SQLModel, table=True):
     __tablename__ = "attendance"
+    __table_args__ = (
+        Index("ix_attendance_professor_status_date", "professor", "status", "date"),
+        # Keyset pagination of GET /attendance by (date, id) within one professor or subject; as
+        # leading columns they also serve plain professor / subject lookups (merges, filters).
+        Index("ix_attendance_professor_date", "professor", "date"),
+        Index("ix_attendance_subject_date", "subject", "date"),
+        Index("ux_attendance_idempotency_key", "idempotency_key", unique=True),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    date: str
+    date: str = Field(index=True)
     timestamp: str
     subject: Optional[str] = None
     professor: str
     status: str
+    # Number of identical classes this row stands for (quick-log batches store one weighted row).
+    count: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    # Derived from `date` on write (see date_columns) so analytics never re-parse the string.
+    day_ordinal: Optional[int] = None
+    # Client-supplied Idempotency-Key of the POST that created the row; a retry finds it instead of inserting again.
+    idempotency_key: Optional[str] = None
+
+
+def date_columns(value: str) -> dict:
+    """Stored day ordinal for a ``YYYY-MM-DD`` date.
+
+    Unparseable dates get ``None`` so writes behave as before; analytics fall
+    back to parsing the string for those rows and leave dates that still do not
+    parse out of the month and weekday trends.
+    """
+    try:
+        parsed = datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return {"day_ordinal": None}
+    return {"day_ordinal": parsed.toordinal()}
+
+
+class AttendanceRollup(SQLModel, table=True):
+    """Per-day attendance counts, kept in step with ``attendance`` by the write routes.
+
+    ``subject`` is stored as ``""`` when the raw row has no subject so it can be
+    part of the primary key.
+    """
+
+    __tablename__ = "attendance_daily_rollup"
+
+    date: str = Field(primary_key=True)
+    professor: str = Field(primary_key=True)
+    subject: str = Field(default="", primary_key=True)
+    status: str = Field(primary_key=True)
+    count: int = 0
+
+
+class AttendanceChange(SQLModel, table=True):
+    """Ids of ``attendance`` rows inserted, updated or deleted on the primary, in commit order.
+
+    Written by triggers (``migrate_schema.py --change-log``), so every writer is
+    covered, and replayed by read replicas from the last ``seq`` they applied.
+    """
+
+    __tablename__ = "attendance_changes"
+
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    row_id: int
+
+
+class ProfessorAlias(SQLModel, table=True):
+    """A legacy professor name and the canonical name analytics report it under.
+
+    Resolved while attendance is aggregated, so merging a name costs one row
+    here instead of rewriting its attendance rows. Chains are kept flat:
+    ``canonical`` is never itself an alias.
+    """
+
+    __tablename__ = "professor_aliases"
+
+    alias: str = Field(primary_key=True)
+    canonical: str
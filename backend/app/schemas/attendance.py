@@ -1,17 +1,50 @@
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
+
+
+STATUSES = ("Present", "Absent")
 
 
 class AttendanceCreate(BaseModel):
+    """One attendance row as POST /attendance and CSV import accept it.
+
+    Both paths validate through this model, so a row analytics cannot read
+    (unparseable date, blank name, unknown status) is rejected either way.
+    """
+
     date: str
     timestamp: Optional[str] = None
     subject: str
     professor: str
     status: str
 
+    @field_validator("date")
+    @classmethod
+    def iso_date(cls, value: str) -> str:
+        try:
+            parsed = datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError("must be a YYYY-MM-DD date")
+        # Stored zero-padded so date ranges compare correctly as strings.
+        return parsed.isoformat()
+
+    @field_validator("subject", "professor")
+    @classmethod
+    def not_blank(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("must not be blank")
+        return value
+
+    @field_validator("status")
+    @classmethod
+    def known_status(cls, value: str) -> str:
+        if value not in STATUSES:
+            raise ValueError(f"must be one of: {', '.join(STATUSES)}")
+        return value
+
     @field_validator("timestamp")
     @classmethod
     def default_timestamp(cls, value: Optional[str]) -> str:
@@ -39,3 +72,14 @@ class BulkQuickLogCreate(BaseModel):
 
 class BulkQuickLogBatch(BaseModel):
     rows: list[BulkQuickLogCreate]
+
+
+class ProfessorMerge(BaseModel):
+    from_name: str = Field(min_length=1)
+    to_name: str = Field(min_length=1)
+
+
+class ProfessorMergeBatch(BaseModel):
+    pairs: list[ProfessorMerge]
+    # "alias" records the mapping and resolves it at query time; "rewrite" updates the stored rows.
+    mode: Literal["alias", "rewrite"] = "alias"
@@ -0,0 +1,114 @@
+"""Professor name merging: lazy aliases resolved at aggregation time, or a set-based rewrite.
+
+An alias is one ``professor_aliases`` row; analytics map the alias to its
+canonical name while tallying groups, so a merge never touches attendance
+rows and can be undone by deleting the alias. ``rewrite`` instead updates
+the stored rows with one ``UPDATE ... WHERE professor IN (...)`` per chunk
+of names.
+"""
+
+import time
+from typing import Iterable
+
+from sqlalchemy import case, inspect
+from sqlmodel import Session, delete, select, update
+
+from app.core.config import settings
+from app.models.attendance import Attendance, ProfessorAlias
+from app.services import rollup
+
+# Names per UPDATE; each costs three bound parameters (IN list plus the CASE arm).
+RENAME_CHUNK = 300
+
+
+def alias_map(session: Session) -> dict[str, str]:
+    return dict(session.exec(select(ProfessorAlias.alias, ProfessorAlias.canonical)).all())
+
+
+_cached: tuple[int, float, dict[str, str]] | None = None
+
+
+def cached_alias_map(session: Session, version: int, ttl: float = 0.0) -> dict[str, str]:
+    """``alias_map()`` for data ``version``, re-read after a write or once ``ttl`` expires.
+
+    Alias changes are writes (they bump the cache version). A database that
+    predates ``professor_aliases`` has no aliases rather than failing every read.
+    """
+    global _cached
+    if _cached is not None:
+        loaded_version, loaded_at, mapping = _cached
+        if loaded_version == version and not (ttl and time.monotonic() - loaded_at > ttl):
+            return mapping
+    if inspect(session.connection()).has_table(ProfessorAlias.__tablename__):
+        mapping = alias_map(session)
+    else:
+        mapping = {}
+    _cached = (version, time.monotonic(), mapping)
+    return mapping
+
+
+def resolve_groups(groups: Iterable[tuple], aliases: dict[str, str]) -> list[tuple]:
+    """Replace the professor of ``rollup.summary_groups`` card rows by its canonical name."""
+    if not aliases:
+        return list(groups)
+    return [
+        (kind, aliases.get(key, key), *rest) if kind == "card" else (kind, key, *rest) for kind, key, *rest in groups
+    ]
+
+
+def _flatten(pairs: Iterable[tuple[str, str]], aliases: dict[str, str]) -> dict[str, str]:
+    """Fold ``pairs`` into ``aliases`` in order, keeping every chain one hop long."""
+    aliases = dict(aliases)
+    for from_name, to_name in pairs:
+        if aliases.get(to_name) == from_name:
+            # Reversing an earlier merge: the old alias becomes the canonical name.
+            del aliases[to_name]
+        else:
+            to_name = aliases.get(to_name, to_name)
+        if to_name == from_name:
+            continue
+        aliases[from_name] = to_name
+        for alias, canonical in aliases.items():
+            if canonical == from_name:
+                aliases[alias] = to_name
+    return aliases
+
+
+def add_aliases(session: Session, pairs: list[tuple[str, str]]) -> dict[str, str]:
+    """Record ``from -> to`` aliases, keeping chains flat. Returns the aliases added, moved or dropped (None)."""
+    current = alias_map(session)
+    merged = _flatten(pairs, current)
+    changed = {alias: merged.get(alias) for alias in current.keys() | merged.keys() if current.get(alias) != merged.get(alias)}
+    if changed:
+        session.exec(delete(ProfessorAlias).where(ProfessorAlias.alias.in_(changed)))
+        session.add_all(
+            ProfessorAlias(alias=alias, canonical=canonical) for alias, canonical in changed.items() if canonical is not None
+        )
+    return changed
+
+
+def remove_alias(session: Session, alias: str) -> bool:
+    return session.exec(delete(ProfessorAlias).where(ProfessorAlias.alias == alias)).rowcount > 0
+
+
+def rewrite(session: Session, pairs: list[tuple[str, str]]) -> int:
+    """Rename professors on the stored rows (and the rollup). Returns the number of rows updated.
+
+    Aliases that pointed at a renamed name follow it to the new one.
+    """
+    renames = _flatten(pairs, {})
+    updated = 0
+    names = list(renames)
+    for start in range(0, len(names), RENAME_CHUNK):
+        chunk = {name: renames[name] for name in names[start:start + RENAME_CHUNK]}
+        result = session.exec(
+            update(Attendance)
+            .where(Attendance.professor.in_(chunk))
+            .values(professor=case(chunk, value=Attendance.professor))
+        )
+        updated += result.rowcount
+        if settings.use_rollup:
+            rollup.rename_professors(session, chunk)
+        for from_name, to_name in chunk.items():
+            session.exec(update(ProfessorAlias).where(ProfessorAlias.canonical == from_name).values(canonical=to_name))
+    return updated
@@ -1,6 +1,6 @@
 import math
 import calendar
-from collections import Counter, defaultdict
+from collections import defaultdict
 from datetime import date, datetime
 from typing import Iterable
 
@@ -8,6 +8,16 @@ from app.models.attendance import Attendance
 
 TARGET_ATTENDANCE = 75.0
 
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+SUBJECT_ORDER = [
+    "Physiology",
+    "Anatomy",
+    "Samhita",
+    "Padarth Vigyan",
+    "Sanskrit (CM Sir)",
+]
+
 
 def _pct(present: int, total: int) -> float:
     if total == 0:
@@ -15,130 +25,188 @@ def _pct(present: int, total: int) -> float:
     return round((present / total) * 100, 1)
 
 
-def _streak(records: list[Attendance]) -> int:
-    if not records:
-        return 0
-    by_day = defaultdict(list)
-    for r in records:
-        by_day[r.date].append(r.status)
-    streak_count = 0
-    for date_key in sorted(by_day.keys(), reverse=True):
-        statuses = by_day[date_key]
-        day_total = len(statuses)
-        day_present = sum(1 for s in statuses if s == "Present")
-        if day_total > 0 and (day_present / day_total) * 100 >= TARGET_ATTENDANCE:
-            streak_count += 1
-        else:
-            break
-    return streak_count
+def _subject_order(subject: str) -> tuple[int, str]:
+    # Unknown subjects sort by name so the order does not depend on row or group order.
+    return (SUBJECT_ORDER.index(subject) if subject in SUBJECT_ORDER else 999, subject)
 
 
-def calc_subject_stat(records: Iterable[Attendance], professor: str) -> dict:
-    subject_records = [r for r in records if r.professor == professor]
-    total = len(subject_records)
-    present = sum(1 for r in subject_records if r.status == "Present")
+def _budget(present: int, total: int) -> dict:
     pct = _pct(present, total)
     bunkable = max(int((present / 0.75) - total), 0) if total > 0 else 0
     needed = max(math.ceil(3 * total - 4 * present), 0)
     return {
-        "professor": professor,
-        "total": total,
-        "present": present,
-        "absent": total - present,
         "percentage": pct,
         "safe_to_skip": bunkable if pct >= TARGET_ATTENDANCE else 0,
         "need_to_attend": needed if pct < TARGET_ATTENDANCE else 0,
         "status_hint": f"Safe to skip {bunkable}" if pct >= TARGET_ATTENDANCE else f"Need {needed} more",
     }
 
-def professor_breakdown(records: Iterable[Attendance], professors: list[str]) -> list[dict]:
-    rows = list(records)
-    result: list[dict] = []
 
-    # Regular teacher rows
-    for professor in professors:
-        result.append(calc_subject_stat(rows, professor))
+def _stat_card(professor: str, present: int, total: int) -> dict:
+    return {"professor": professor, "total": total, "present": present, "absent": total - present, **_budget(present, total)}
+
+
+def _subject_card(subject: str, present: int, total: int) -> dict:
+    return {"subject": subject, "present": present, "total": total, **_budget(present, total)}
+
+
+class AttendanceCounts:
+    """Present/total tallies per dimension, gathered in a single pass.
+
+    Every analytics view is derived from these tallies. They are built either
+    from raw rows (each weighted by its ``count``) or from pre-grouped
+    ``(date, professor, subject, status, count)`` tuples returned by a SQL
+    ``GROUP BY``, so the cost of everything downstream depends on the number
+    of groups rather than the number of attendance rows.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.present = 0
+        self.by_day: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.by_month: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.by_weekday: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.by_professor: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.by_unspecified_subject: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        self.by_subject: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        # date -> subject (None for subject-less rows) -> [present, total]
+        self.by_day_subject: dict[str, dict[str | None, list[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+        self.day_dates: dict[str, date] = {}
+        self._day_keys: dict[str, tuple[str, str]] = {}
+
+    def _keys_for(self, date_value: str, day_ordinal: int | None) -> tuple[str, str] | None:
+        """``(YYYY-MM, weekday)`` for a date, or None when it cannot be parsed."""
+        if date_value in self._day_keys:
+            return self._day_keys[date_value]
+        # Stored ordinals skip string parsing; rows written before the column existed fall back to it.
+        if day_ordinal is not None:
+            day = date.fromordinal(day_ordinal)
+        else:
+            try:
+                day = datetime.strptime(date_value, "%Y-%m-%d").date()
+            except (TypeError, ValueError):
+                day = None
+        keys = None
+        if day is not None:
+            keys = (f"{day.year:04d}-{day.month:02d}", WEEKDAYS[day.weekday()])
+            self.day_dates[date_value] = day
+        self._day_keys[date_value] = keys
+        return keys
+
+    def add_day(self, date_value: str, status: str, count: int = 1, day_ordinal: int | None = None) -> None:
+        present = count if status == "Present" else 0
+        self.total += count
+        self.present += present
+        bucket = self.by_day[date_value]
+        bucket[0] += present
+        bucket[1] += count
+        # An unparseable stored date still counts everywhere except the month and weekday trends.
+        keys = self._keys_for(date_value, day_ordinal)
+        if keys is not None:
+            month_key, weekday = keys
+            for bucket in (self.by_month[month_key], self.by_weekday[weekday]):
+                bucket[0] += present
+                bucket[1] += count
+
+    def add_card(self, professor: str, subject: str | None, status: str, count: int = 1) -> None:
+        present = count if status == "Present" else 0
+        bucket = self.by_professor[professor]
+        bucket[0] += present
+        bucket[1] += count
+        if subject:
+            bucket = self.by_subject[subject]
+            bucket[0] += present
+            bucket[1] += count
+        if professor == "Unspecified" and subject:
+            bucket = self.by_unspecified_subject[subject]
+            bucket[0] += present
+            bucket[1] += count
+
+    def add_day_subject(self, date_value: str, subject: str | None, status: str, count: int = 1) -> None:
+        bucket = self.by_day_subject[date_value][subject or None]
+        bucket[0] += count if status == "Present" else 0
+        bucket[1] += count
+
+    def add(
+        self,
+        date_value: str,
+        professor: str,
+        subject: str | None,
+        status: str,
+        count: int = 1,
+        day_ordinal: int | None = None,
+    ) -> None:
+        """Tally one row (or fine group) into every dimension."""
+        self.add_day(date_value, status, count, day_ordinal)
+        self.add_card(professor, subject, status, count)
+        self.add_day_subject(date_value, subject, status, count)
+
+
+def count_records(records: Iterable[Attendance]) -> AttendanceCounts:
+    counts = AttendanceCounts()
+    for r in records:
+        counts.add(r.date, r.professor, r.subject, r.status, r.count, r.day_ordinal)
+    return counts
+
+
+def count_summary_groups(groups: Iterable[tuple]) -> AttendanceCounts:
+    """Tally the ``(kind, key, subject, status, count, day_ordinal)`` rows of ``rollup.summary_groups``."""
+    counts = AttendanceCounts()
+    for kind, key, subject, status, count, day_ordinal in groups:
+        if kind == "day":
+            counts.add_day(key, status, count, day_ordinal)
+        elif kind == "card":
+            counts.add_card(key, subject, status, count)
+        else:
+            counts.add_day_subject(key, subject, status, count)
+    return counts
 
-    # Subject-mode rows logged with "Unspecified" teacher become subject-tagged buckets.
-    by_subject_unspecified: dict[str, list[Attendance]] = defaultdict(list)
-    for r in rows:
-        if r.professor == "Unspecified" and r.subject:
-            by_subject_unspecified[r.subject].append(r)
-
-    for subject in sorted(by_subject_unspecified.keys(), key=lambda s: SUBJECT_ORDER.index(s) if s in SUBJECT_ORDER else 999):
-        d = by_subject_unspecified[subject]
-        total = len(d)
-        present = sum(1 for x in d if x.status == "Present")
-        pct = _pct(present, total)
-        bunkable = max(int((present / 0.75) - total), 0) if total > 0 else 0
-        needed = max(math.ceil(3 * total - 4 * present), 0)
-        result.append(
-            {
-                "professor": f"{subject} (Unspecified)",
-                "total": total,
-                "present": present,
-                "absent": total - present,
-                "percentage": pct,
-                "safe_to_skip": bunkable if pct >= TARGET_ATTENDANCE else 0,
-                "need_to_attend": needed if pct < TARGET_ATTENDANCE else 0,
-                "status_hint": f"Safe to skip {bunkable}" if pct >= TARGET_ATTENDANCE else f"Need {needed} more",
-            }
-        )
 
-    return result
+def _streak_from_counts(counts: AttendanceCounts) -> int:
+    streak_count = 0
+    for date_key in sorted(counts.by_day.keys(), reverse=True):
+        day_present, day_total = counts.by_day[date_key]
+        if day_total > 0 and (day_present / day_total) * 100 >= TARGET_ATTENDANCE:
+            streak_count += 1
+        else:
+            break
+    return streak_count
 
 
-SUBJECT_ORDER = [
-    "Physiology",
-    "Anatomy",
-    "Samhita",
-    "Padarth Vigyan",
-    "Sanskrit (CM Sir)",
-]
+def subject_stat_from_counts(counts: AttendanceCounts, professor: str) -> dict:
+    present, total = counts.by_professor.get(professor, (0, 0))
+    return _stat_card(professor, present, total)
 
 
-def calc_grouped_subjects(records: Iterable[Attendance]) -> list[dict]:
-    rows = list(records)
-    by_subject: dict[str, list[Attendance]] = defaultdict(list)
-    for r in rows:
-        if r.subject:
-            by_subject[r.subject].append(r)
-
-    subjects = sorted(by_subject.keys(), key=lambda s: SUBJECT_ORDER.index(s) if s in SUBJECT_ORDER else 999)
+def professor_breakdown_from_counts(counts: AttendanceCounts, professors: list[str]) -> list[dict]:
     result: list[dict] = []
-    for subject in subjects:
-        d = by_subject[subject]
-        total = len(d)
-        present = sum(1 for r in d if r.status == "Present")
-        pct = _pct(present, total)
-        bunkable = max(int((present / 0.75) - total), 0) if total > 0 else 0
-        needed = max(math.ceil(3 * total - 4 * present), 0)
-        result.append(
-            {
-                "subject": subject,
-                "present": present,
-                "total": total,
-                "percentage": pct,
-                "safe_to_skip": bunkable if pct >= TARGET_ATTENDANCE else 0,
-                "need_to_attend": needed if pct < TARGET_ATTENDANCE else 0,
-                "status_hint": f"Safe to skip {bunkable}" if pct >= TARGET_ATTENDANCE else f"Need {needed} more",
-            }
-        )
+    for professor in professors:
+        result.append(subject_stat_from_counts(counts, professor))
+
+    # Subject-mode rows logged with "Unspecified" teacher become subject-tagged buckets.
+    for subject in sorted(counts.by_unspecified_subject.keys(), key=_subject_order):
+        present, total = counts.by_unspecified_subject[subject]
+        result.append(_stat_card(f"{subject} (Unspecified)", present, total))
     return result
 
 
+def grouped_subjects_from_counts(counts: AttendanceCounts) -> list[dict]:
+    return [_subject_card(subject, *counts.by_subject[subject]) for subject in sorted(counts.by_subject, key=_subject_order)]
+
+
 def _month_end(year: int, month: int) -> date:
     last_day = calendar.monthrange(year, month)[1]
     return date(year, month, last_day)
 
 
-def monthly_snapshots(records: Iterable[Attendance]) -> list[dict]:
-    rows = list(records)
-    if not rows:
+def monthly_snapshots_from_counts(counts: AttendanceCounts) -> list[dict]:
+    if not counts.day_dates:
         return []
 
-    dates = sorted({datetime.strptime(r.date, "%Y-%m-%d").date() for r in rows})
-    min_d, max_d = dates[0], dates[-1]
+    # Walk the distinct days once in date order, carrying cumulative counters
+    # forward month by month instead of re-filtering all history per month.
+    days = sorted(counts.day_dates.items(), key=lambda kv: kv[1])
+    min_d, max_d = days[0][1], days[-1][1]
     today = date.today()
 
     months: list[tuple[int, int]] = []
@@ -155,6 +223,11 @@ def monthly_snapshots(records: Iterable[Attendance]) -> list[dict]:
     prev_subject_pct: dict[str, float] | None = None
     prev_overall: float | None = None
 
+    day_index = 0
+    total = 0
+    present = 0
+    by_subject: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+
     for (yy, mm) in months:
         cutoff = _month_end(yy, mm)
         is_complete = cutoff < today
@@ -164,12 +237,18 @@ def monthly_snapshots(records: Iterable[Attendance]) -> list[dict]:
         if cutoff > today and not is_mtd:
             continue
 
-        filtered = [r for r in rows if datetime.strptime(r.date, "%Y-%m-%d").date() <= min(cutoff, today)]
-        total = len(filtered)
-        present = sum(1 for r in filtered if r.status == "Present")
+        limit = min(cutoff, today)
+        while day_index < len(days) and days[day_index][1] <= limit:
+            for subject, (p, t) in counts.by_day_subject[days[day_index][0]].items():
+                total += t
+                present += p
+                if subject:
+                    by_subject[subject][0] += p
+                    by_subject[subject][1] += t
+            day_index += 1
         overall_pct = _pct(present, total)
 
-        grouped = calc_grouped_subjects(filtered)
+        grouped = [_subject_card(subject, *by_subject[subject]) for subject in sorted(by_subject, key=_subject_order)]
         subject_pct = {g["subject"]: float(g["percentage"]) for g in grouped}
 
         deltas = {}
@@ -211,38 +290,19 @@ def monthly_snapshots(records: Iterable[Attendance]) -> list[dict]:
     return snapshots
 
 
-def dashboard_summary(records: list[Attendance], professors: list[str]) -> dict:
-    total = len(records)
-    present = sum(1 for r in records if r.status == "Present")
-    absent = total - present
-    month_total = Counter()
-    month_present = Counter()
-    dow_counter_total = Counter()
-    dow_counter_present = Counter()
-    for r in records:
-        dt = datetime.strptime(r.date, "%Y-%m-%d")
-        month_key = dt.strftime("%Y-%m")
-        month_total[month_key] += 1
-        if r.status == "Present":
-            month_present[month_key] += 1
-        dow_counter_total[dt.strftime("%A")] += 1
-        if r.status == "Present":
-            dow_counter_present[dt.strftime("%A")] += 1
-
+def dashboard_summary_from_counts(counts: AttendanceCounts, professors: list[str]) -> dict:
     burnout = []
-    for dow in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]:
-        t = dow_counter_total[dow]
-        p = dow_counter_present[dow]
+    for dow in WEEKDAYS:
+        p, t = counts.by_weekday.get(dow, (0, 0))
         if t > 0:
             burnout.append({"day": dow, "attendance": round((p / t) * 100, 1)})
 
-    weekly_total = max(len({r.date for r in records}), 1)
-    predicted = _pct(present + (weekly_total * 8), total + (weekly_total * 10))
+    weekly_total = max(len(counts.by_day), 1)
+    predicted = _pct(counts.present + (weekly_total * 8), counts.total + (weekly_total * 10))
 
     month_trend = []
-    for month in sorted(month_total.keys()):
-        t = month_total[month]
-        p = month_present[month]
+    for month in sorted(counts.by_month.keys()):
+        p, t = counts.by_month[month]
         month_trend.append(
             {
                 "month": month,
@@ -254,14 +314,41 @@ def dashboard_summary(records: list[Attendance], professors: list[str]) -> dict:
 
     return {
         "overall": {
-            "total": total,
-            "present": present,
-            "absent": absent,
-            "percentage": _pct(present, total),
-            "streak": _streak(records),
+            "total": counts.total,
+            "present": counts.present,
+            "absent": counts.total - counts.present,
+            "percentage": _pct(counts.present, counts.total),
+            "streak": _streak_from_counts(counts),
         },
-        "subject_cards": professor_breakdown(records, professors),
+        "subject_cards": professor_breakdown_from_counts(counts, professors),
         "month_trend": month_trend,
         "burnout_analysis": burnout,
         "predictive_trajectory": {"projected_percentage": predicted},
     }
+
+
+# Record-based entry points: one pass to tally, then derive from the counts.
+
+
+def _streak(records: Iterable[Attendance]) -> int:
+    return _streak_from_counts(count_records(records))
+
+
+def calc_subject_stat(records: Iterable[Attendance], professor: str) -> dict:
+    return subject_stat_from_counts(count_records(records), professor)
+
+
+def professor_breakdown(records: Iterable[Attendance], professors: list[str]) -> list[dict]:
+    return professor_breakdown_from_counts(count_records(records), professors)
+
+
+def calc_grouped_subjects(records: Iterable[Attendance]) -> list[dict]:
+    return grouped_subjects_from_counts(count_records(records))
+
+
+def monthly_snapshots(records: Iterable[Attendance]) -> list[dict]:
+    return monthly_snapshots_from_counts(count_records(records))
+
+
+def dashboard_summary(records: Iterable[Attendance], professors: list[str]) -> dict:
+    return dashboard_summary_from_counts(count_records(records), professors)
@@ -0,0 +1,107 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.perf import note, phase
+
+
+class AnalyticsCache:
+    """In-process LRU of serialized analytics responses.
+
+    Entries belong to a data version; every write route calls ``invalidate()``
+    which bumps the version and drops all entries. ETags are a hash of the
+    response body, so they stay valid across restarts and instances and an
+    ``If-None-Match`` hit on a cached entry is answered without touching the
+    database. ``ttl`` bounds staleness when writes land on another instance.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 0.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self._entries: OrderedDict[str, tuple[float, str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def _get(self, key: str) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, etag, body = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return etag, body
+
+    def _put(self, key: str, version: int, etag: str, body: bytes) -> None:
+        with self._lock:
+            # A write landed while we were computing; the result may already be stale.
+            if version != self.version or self.max_entries <= 0:
+                return
+            self._entries[key] = (time.monotonic(), etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def respond(self, request: Request, build: Callable[[], Any]) -> Response:
+        key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        cached = self._get(key)
+        if cached is None:
+            version = self.version
+            # Whatever build() spends outside its own db phase is analytics work.
+            with phase("analytics"):
+                content = build()
+            with phase("serialize"):
+                body = JSONResponse(content=jsonable_encoder(content)).body
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self._put(key, version, etag, body)
+        else:
+            etag, body = cached
+        note("cache", "miss" if cached is None else "hit")
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+            }
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+analytics_cache = AnalyticsCache(max_entries=settings.analytics_cache_size, ttl=settings.analytics_cache_ttl)
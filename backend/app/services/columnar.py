@@ -0,0 +1,173 @@
+"""Optional NumPy engine: attendance held as columns and reduced with ``np.bincount``.
+
+Selected with ``ANALYTICS_ENGINE=numpy``. A snapshot of the raw table is
+loaded once per data version; each request then reduces the arrays into an
+``AttendanceCounts`` with a handful of vectorized bincounts, and every
+analytics view is formatted from those counts exactly as on the SQL path.
+"""
+
+import time
+from datetime import date, datetime
+
+from sqlmodel import Session, select
+
+from app.models.attendance import Attendance
+from app.services.analytics import WEEKDAYS, AttendanceCounts
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is only needed for ANALYTICS_ENGINE=numpy
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("ANALYTICS_ENGINE=numpy requires numpy; install it with `pip install numpy`.")
+
+
+def _encode(values: list) -> tuple["np.ndarray", list]:
+    labels: dict = {}
+    codes = np.fromiter((labels.setdefault(v, len(labels)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(labels)
+
+
+def _ordinal(value: str) -> int:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+class AttendanceColumns:
+    """Attendance as parallel arrays.
+
+    ``day`` holds int32 day ordinals; dates, professors and subjects are
+    categorical int codes into the ``*_labels`` lists (subject ``None`` is a
+    label like any other) and ``day_values`` holds the ordinal of each date
+    label. Status is reduced to a 0/1 ``present`` column.
+    """
+
+    def __init__(self, dates: list[str], professors: list[str], subjects: list, statuses: list[str], weights: list[int]):
+        _require_numpy()
+        self.size = len(dates)
+        self.day_code, self.day_labels = _encode(dates)
+        # 0 marks a date that does not parse; it is left out of month and weekday trends.
+        self.day_values = np.array([_ordinal(d) for d in self.day_labels], dtype=np.int32)
+        self.day = self.day_values[self.day_code] if self.size else np.zeros(0, dtype=np.int32)
+        self.professor, self.professor_labels = _encode(professors)
+        self.subject, self.subject_labels = _encode([s or None for s in subjects])
+        self.present = np.fromiter((s == "Present" for s in statuses), dtype=np.int64, count=self.size)
+        self.weight = np.asarray(weights, dtype=np.int64)
+        self.present_weight = self.weight * self.present
+
+    @classmethod
+    def load(cls, session: Session, aliases: dict[str, str] | None = None) -> "AttendanceColumns":
+        """Load the raw table, reporting aliased professors under their canonical name."""
+        stmt = select(Attendance.date, Attendance.professor, Attendance.subject, Attendance.status, Attendance.count)
+        rows = session.exec(stmt).all()
+        if not rows:
+            return cls([], [], [], [], [])
+        dates, professors, subjects, statuses, weights = (list(column) for column in zip(*rows))
+        if aliases:
+            professors = [aliases.get(p, p) for p in professors]
+        return cls(dates, professors, subjects, statuses, weights)
+
+    def _groups(self) -> tuple["np.ndarray", ...]:
+        """Reduce the rows to (day, professor, subject) groups with a sort and ``np.add.reduceat``.
+
+        The snapshot never changes after load, so this runs once; every
+        ``to_counts()`` call afterwards only touches the group arrays.
+        """
+        if not hasattr(self, "_group_arrays"):
+            n_professors, n_subjects = len(self.professor_labels), len(self.subject_labels)
+            key = (self.day_code.astype(np.int64) * n_professors + self.professor) * n_subjects + self.subject
+            order = np.argsort(key, kind="stable")
+            sorted_key = key[order]
+            starts = np.flatnonzero(np.r_[True, sorted_key[1:] != sorted_key[:-1]])
+            g_total = np.add.reduceat(self.weight[order], starts)
+            g_present = np.add.reduceat(self.present_weight[order], starts)
+            g_rest, g_subject = np.divmod(sorted_key[starts], n_subjects)
+            g_day, g_professor = np.divmod(g_rest, n_professors)
+            self._group_arrays = (g_day, g_professor, g_subject, g_present, g_total)
+        return self._group_arrays
+
+    def to_counts(self, date_from: str | None = None, date_to: str | None = None) -> AttendanceCounts:
+        """Reduce the snapshot, limited to ``date_from``..``date_to`` (inclusive YYYY-MM-DD) when given."""
+        counts = AttendanceCounts()
+        if self.size == 0:
+            return counts
+
+        n_days, n_professors, n_subjects = len(self.day_labels), len(self.professor_labels), len(self.subject_labels)
+        g_day, g_professor, g_subject, g_present, g_total = self._groups()
+        if date_from or date_to:
+            # The snapshot holds all history; a window only masks the (much smaller) group arrays.
+            g_ordinal = self.day_values[g_day]
+            keep = np.ones(len(g_day), dtype=bool)
+            if date_from:
+                keep &= g_ordinal >= date.fromisoformat(date_from).toordinal()
+            if date_to:
+                keep &= g_ordinal <= date.fromisoformat(date_to).toordinal()
+            g_day, g_professor, g_subject, g_present, g_total = (
+                column[keep] for column in (g_day, g_professor, g_subject, g_present, g_total)
+            )
+
+        counts.total = int(g_total.sum())
+        counts.present = int(g_present.sum())
+
+        def reduce(codes, length, mask=None):
+            if mask is not None:
+                codes, p, t = codes[mask], g_present[mask], g_total[mask]
+            else:
+                p, t = g_present, g_total
+            used = np.bincount(codes, minlength=length)
+            p = np.bincount(codes, weights=p, minlength=length).astype(np.int64).tolist()
+            t = np.bincount(codes, weights=t, minlength=length).astype(np.int64).tolist()
+            return [(i, p[i], t[i]) for i in np.flatnonzero(used).tolist()]
+
+        for i, p, t in reduce(g_day, n_days):
+            label = self.day_labels[i]
+            counts.by_day[label] = [p, t]
+            if not self.day_values[i]:
+                continue
+            day_date = date.fromordinal(int(self.day_values[i]))
+            counts.day_dates[label] = day_date
+            for bucket in (counts.by_month[f"{day_date.year:04d}-{day_date.month:02d}"], counts.by_weekday[WEEKDAYS[day_date.weekday()]]):
+                bucket[0] += p
+                bucket[1] += t
+
+        for i, p, t in reduce(g_professor, n_professors):
+            counts.by_professor[self.professor_labels[i]] = [p, t]
+
+        for i, p, t in reduce(g_subject, n_subjects):
+            if self.subject_labels[i]:
+                counts.by_subject[self.subject_labels[i]] = [p, t]
+
+        if "Unspecified" in self.professor_labels:
+            mask = g_professor == self.professor_labels.index("Unspecified")
+            for i, p, t in reduce(g_subject, n_subjects, mask):
+                if self.subject_labels[i]:
+                    counts.by_unspecified_subject[self.subject_labels[i]] = [p, t]
+
+        for flat, p, t in reduce(g_day * n_subjects + g_subject, n_days * n_subjects):
+            day_index, subject_index = divmod(flat, n_subjects)
+            counts.by_day_subject[self.day_labels[day_index]][self.subject_labels[subject_index]] = [p, t]
+
+        return counts
+
+
+_snapshot: tuple[int, float, AttendanceColumns] | None = None
+
+
+def snapshot(session: Session, version: int, ttl: float = 0.0, aliases: dict[str, str] | None = None) -> AttendanceColumns:
+    """Return the columnar snapshot for ``version``, reloading it after a write or once ``ttl`` expires.
+
+    Alias changes count as writes (they bump the cache version), so ``aliases`` only matters on reload.
+    """
+    global _snapshot
+    if _snapshot is not None:
+        loaded_version, loaded_at, columns = _snapshot
+        if loaded_version == version and not (ttl and time.monotonic() - loaded_at > ttl):
+            return columns
+    columns = AttendanceColumns.load(session, aliases)
+    _snapshot = (version, time.monotonic(), columns)
+    return columns
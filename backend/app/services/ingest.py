@@ -0,0 +1,140 @@
+import csv
+import time
+from collections import Counter
+from itertools import islice
+from typing import Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlmodel import Session, insert
+
+from app.core.config import settings
+from app.models.attendance import Attendance, date_columns
+from app.schemas.attendance import AttendanceCreate
+from app.services import rollup
+
+IMPORT_COLUMNS = ("date", "subject", "professor", "status")
+# Rejected rows listed in an import report; the rest are only counted.
+MAX_REJECT_SAMPLES = 100
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def insert_rows(session: Session, rows: Iterable[dict], chunk_size: int | None = None) -> tuple[int, int]:
+    """Insert attendance value dicts with one executemany per chunk.
+
+    Each chunk (and its rollup update) is committed on its own, so a failure
+    part-way through keeps the chunks that already landed. Derived date
+    columns missing from a row are filled in from ``date``. Returns
+    ``(inserted, chunks)``.
+    """
+    size = max(chunk_size or settings.bulk_chunk_size, 1)
+    inserted = 0
+    chunks = 0
+    for chunk in _chunks(rows, size):
+        for r in chunk:
+            if "day_ordinal" not in r:
+                r.update(date_columns(r["date"]))
+        session.exec(insert(Attendance), params=chunk)
+        if settings.use_rollup:
+            deltas: Counter = Counter()
+            for r in chunk:
+                deltas[(r["date"], r["professor"], r.get("subject"), r["status"])] += r.get("count", 1)
+            rollup.apply_deltas(session, deltas)
+        session.commit()
+        inserted += len(chunk)
+        chunks += 1
+    return inserted, chunks
+
+
+def _validate(row: dict) -> dict:
+    record = AttendanceCreate(
+        date=row.get("date"),
+        timestamp=row.get("timestamp") or None,
+        subject=row.get("subject"),
+        professor=row.get("professor"),
+        status=row.get("status"),
+    )
+    count = int(row.get("count") or 1)
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    return {**record.model_dump(), "count": count, **date_columns(record.date)}
+
+
+def _reason(exc: ValueError) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+    return str(exc)
+
+
+def import_csv(
+    session: Session, lines: Iterable[str], chunk_size: int | None = None, skip_rows: int = 0
+) -> Iterator[dict]:
+    """Validate CSV rows like POST /attendance and insert them chunk by chunk.
+
+    ``lines`` is read lazily, so memory is bounded by one chunk whatever the
+    file size. Columns are matched by header name: ``date``, ``subject``,
+    ``professor`` and ``status`` are required, ``timestamp`` and ``count``
+    optional, anything else (such as an export's ``id``) is ignored.
+
+    Yields a progress report after each committed chunk and a final report
+    with ``done`` set. A chunk that fails is rolled back on its own and ends
+    the import; earlier chunks stay committed and ``resume_skip_rows`` says
+    where to pick up. Raises ``ValueError`` for a missing header column.
+    """
+    reader = csv.DictReader(lines)
+    missing = [name for name in IMPORT_COLUMNS if name not in (reader.fieldnames or ())]
+    if missing:
+        raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+    return _import_rows(session, reader, max(chunk_size or settings.bulk_chunk_size, 1), skip_rows)
+
+
+def _import_rows(session: Session, reader: csv.DictReader, size: int, skip_rows: int) -> Iterator[dict]:
+    started = time.perf_counter()
+    report = {"rows": 0, "inserted": 0, "classes": 0, "rejected": 0, "chunks": 0}
+    rejects: list[dict] = []
+    failed_chunk = None
+    committed_rows = 0
+
+    def progress() -> dict:
+        elapsed = time.perf_counter() - started
+        return {
+            **report,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_second": round(report["rows"] / elapsed) if elapsed else None,
+        }
+
+    def valid_rows() -> Iterator[tuple[int, dict]]:
+        for row in islice(reader, skip_rows, None):
+            report["rows"] += 1
+            try:
+                yield reader.line_num, _validate(row)
+            except ValueError as exc:
+                report["rejected"] += 1
+                if len(rejects) < MAX_REJECT_SAMPLES:
+                    rejects.append({"line": reader.line_num, "error": _reason(exc)})
+
+    for chunk in _chunks(valid_rows(), size):
+        values = [value for _, value in chunk]
+        try:
+            insert_rows(session, values, chunk_size=len(values))
+        except Exception as exc:
+            session.rollback()
+            # The driver's own error, without the statement and parameter dump SQLAlchemy wraps it in.
+            error = getattr(exc, "orig", None) or exc
+            failed_chunk = {"first_line": chunk[0][0], "last_line": chunk[-1][0], "error": f"{type(error).__name__}: {error}"}
+            break
+        report["inserted"] += len(values)
+        report["classes"] += sum(value["count"] for value in values)
+        report["chunks"] += 1
+        committed_rows = report["rows"]
+        yield progress()
+
+    final = {**progress(), "done": True, "rejects": rejects, "failed_chunk": failed_chunk}
+    if failed_chunk is not None:
+        # Data rows up to the last committed chunk: pass as skip_rows to retry from the failed one.
+        final["resume_skip_rows"] = skip_rows + committed_rows
+    yield final
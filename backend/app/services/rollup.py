@@ -0,0 +1,194 @@
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import literal, null, tuple_, union_all
+from sqlmodel import Session, SQLModel, delete, func, insert, select
+
+from app.models.attendance import Attendance, AttendanceRollup
+
+RollupKey = tuple[str, str, Optional[str], str]
+
+# Keys per (date, professor, subject, status) IN (...) lookup: four bound parameters each.
+KEY_CHUNK = 200
+
+
+def rollup_key(row: Attendance) -> RollupKey:
+    return (row.date, row.professor, row.subject, row.status)
+
+
+def row_deltas(row: Attendance, sign: int = 1) -> Counter:
+    return Counter({rollup_key(row): sign * row.count})
+
+
+def _in_window(column, date_from: Optional[str], date_to: Optional[str]) -> list:
+    # Dates are stored as YYYY-MM-DD, so string order is date order and the date index serves the range.
+    clauses = []
+    if date_from:
+        clauses.append(column >= date_from)
+    if date_to:
+        clauses.append(column <= date_to)
+    return clauses
+
+
+def raw_groups(session: Session) -> list[tuple]:
+    """Group the raw ``attendance`` table by rollup key (used by verify).
+
+    Rows are ``(date, professor, subject, status, count, day_ordinal)``.
+    """
+    stmt = select(
+        Attendance.date,
+        Attendance.professor,
+        Attendance.subject,
+        Attendance.status,
+        func.sum(Attendance.count),
+        func.max(Attendance.day_ordinal),
+    ).group_by(Attendance.date, Attendance.professor, Attendance.subject, Attendance.status)
+    return session.exec(stmt).all()
+
+
+def rollup_groups(session: Session) -> list[tuple]:
+    stmt = select(
+        AttendanceRollup.date,
+        AttendanceRollup.professor,
+        AttendanceRollup.subject,
+        AttendanceRollup.status,
+        AttendanceRollup.count,
+    )
+    return [(d, p, s or None, st, c) for d, p, s, st, c in session.exec(stmt).all()]
+
+
+def summary_groups(
+    session: Session,
+    use_rollup: bool = False,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    day_subjects: bool = False,
+) -> list[tuple]:
+    """Coarse groups every analytics view is built from, in one round trip.
+
+    Rows are ``(kind, key, subject, status, count, day_ordinal)``:
+
+    - ``("day", date, None, ...)`` per (date, status) for the overall, day, month,
+      weekday and streak numbers;
+    - ``("card", professor, subject, ...)`` per (professor, subject, status) for
+      the professor and subject cards;
+    - ``("day_subject", date, subject, ...)`` per (date, subject, status), only
+      with ``day_subjects`` (monthly snapshots need day x subject).
+
+    So the transfer grows with days and cards, not with rows. Reads the rollup
+    table instead of ``attendance`` with ``use_rollup`` and is limited to
+    ``date_from``..``date_to`` (inclusive) when given.
+    """
+    table = AttendanceRollup if use_rollup else Attendance
+    window = _in_window(table.date, date_from, date_to)
+    # The rollup has no day_ordinal; analytics then parse the date string once per day.
+    ordinal = null() if use_rollup else func.max(Attendance.day_ordinal)
+    total = func.sum(table.count)
+    parts = [
+        select(literal("day"), table.date, null(), table.status, total, ordinal)
+        .where(*window)
+        .group_by(table.date, table.status),
+        select(literal("card"), table.professor, table.subject, table.status, total, null())
+        .where(*window)
+        .group_by(table.professor, table.subject, table.status),
+    ]
+    if day_subjects:
+        parts.append(
+            select(literal("day_subject"), table.date, table.subject, table.status, total, null())
+            .where(*window)
+            .group_by(table.date, table.subject, table.status)
+        )
+    return session.connection().execute(union_all(*parts)).all()
+
+
+def apply_deltas(session: Session, deltas: Counter) -> None:
+    """Add signed counts to rollup rows, dropping rows that reach zero.
+
+    Runs inside the caller's transaction so the rollup commits together with
+    the raw rows.
+    """
+    changed = [(key, delta) for key, delta in deltas.items() if delta]
+    if not changed:
+        return
+    stmt = sqlite_insert(AttendanceRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date", "professor", "subject", "status"],
+        set_={"count": AttendanceRollup.count + stmt.excluded.count},
+    )
+    # One executemany for all keys rather than a statement per key.
+    session.connection().execute(
+        stmt,
+        [
+            {"date": date_value, "professor": professor, "subject": subject or "", "status": status, "count": delta}
+            for (date_value, professor, subject, status), delta in changed
+        ],
+    )
+    # Only keys that went down can have reached zero; look them up by primary key instead of scanning.
+    lowered = [(d, p, s or "", st) for (d, p, s, st), delta in changed if delta < 0]
+    key = tuple_(AttendanceRollup.date, AttendanceRollup.professor, AttendanceRollup.subject, AttendanceRollup.status)
+    for start in range(0, len(lowered), KEY_CHUNK):
+        session.exec(
+            delete(AttendanceRollup).where(key.in_(lowered[start:start + KEY_CHUNK]), AttendanceRollup.count <= 0)
+        )
+
+
+def delete_date(session: Session, date_value: str) -> None:
+    session.exec(delete(AttendanceRollup).where(AttendanceRollup.date == date_value))
+
+
+def rename_professors(session: Session, renames: dict[str, str]) -> None:
+    """Move every rollup row of each ``from`` professor onto its ``to`` name, merging with existing keys."""
+    renames = {from_name: to_name for from_name, to_name in renames.items() if from_name != to_name}
+    if not renames:
+        return
+    rows = session.exec(select(AttendanceRollup).where(AttendanceRollup.professor.in_(renames))).all()
+    deltas: Counter = Counter()
+    for row in rows:
+        deltas[(row.date, renames[row.professor], row.subject, row.status)] += row.count
+    session.exec(delete(AttendanceRollup).where(AttendanceRollup.professor.in_(renames)))
+    apply_deltas(session, deltas)
+
+
+def rebuild(session: Session) -> int:
+    """Recreate the rollup from the raw table in one INSERT ... SELECT. Returns the group count."""
+    SQLModel.metadata.create_all(session.get_bind(), tables=[AttendanceRollup.__table__])
+    session.exec(delete(AttendanceRollup))
+    source = select(
+        Attendance.date,
+        Attendance.professor,
+        func.coalesce(Attendance.subject, ""),
+        Attendance.status,
+        func.sum(Attendance.count),
+    ).group_by(Attendance.date, Attendance.professor, func.coalesce(Attendance.subject, ""), Attendance.status)
+    session.exec(
+        insert(AttendanceRollup).from_select(["date", "professor", "subject", "status", "count"], source)
+    )
+    session.commit()
+    return session.exec(select(func.count()).select_from(AttendanceRollup)).one()
+
+
+def verify(session: Session) -> list[dict]:
+    """Compare the rollup with the raw table and return every mismatching key."""
+    expected: Counter = Counter()
+    for date_value, professor, subject, status, count, _ in raw_groups(session):
+        expected[(date_value, professor, subject or None, status)] += count
+    actual: Counter = Counter()
+    for date_value, professor, subject, status, count in rollup_groups(session):
+        actual[(date_value, professor, subject, status)] += count
+
+    mismatches: list[dict] = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: tuple(x or "" for x in k)):
+        if expected[key] != actual[key]:
+            date_value, professor, subject, status = key
+            mismatches.append(
+                {
+                    "date": date_value,
+                    "professor": professor,
+                    "subject": subject,
+                    "status": status,
+                    "expected": expected[key],
+                    "actual": actual[key],
+                }
+            )
+    return mismatches
@@ -0,0 +1,21 @@
+"""Timings for each public function in app/services/analytics.py over generated datasets."""
+
+import pytest
+
+from app.api.routes import PROFESSORS
+from app.services import analytics
+
+FUNCTIONS = {
+    "dashboard_summary": lambda rows: analytics.dashboard_summary(rows, professors=PROFESSORS),
+    "professor_breakdown": lambda rows: analytics.professor_breakdown(rows, professors=PROFESSORS),
+    "calc_grouped_subjects": analytics.calc_grouped_subjects,
+    "monthly_snapshots": analytics.monthly_snapshots,
+    "_streak": analytics._streak,
+}
+
+
+@pytest.mark.parametrize("name", list(FUNCTIONS))
+def bench_analytics_function(benchmark, records, size, name):
+    benchmark.group = f"analytics:{name}"
+    benchmark.extra_info["rows"] = len(records)
+    benchmark(FUNCTIONS[name], records)
@@ -0,0 +1,60 @@
+"""End-to-end timings for every GET route through FastAPI's TestClient.
+
+The analytics response cache is cleared before each round so the numbers
+measure the DB read and the computation, not a cache hit.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.engine import get_async_read_session, get_async_session, get_read_session, get_session
+from app.main import api_prefix, app
+from app.services.cache import analytics_cache
+
+ROUTES = [
+    "/health",
+    "/attendance",
+    "/dashboard/summary",
+    "/dashboard/bundle",
+    "/simulator/subjects",
+    "/professors/breakdown",
+    "/subjects/cumulative",
+    "/insights/monthly",
+    "/insights/bunk-budget",
+    "/meta/count",
+]
+
+
+@pytest.fixture(scope="session")
+def client(dataset_engine, dataset_path):
+    # Routes depend on the async variants instead when ASYNC_DB is set.
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{dataset_path}")
+
+    def session_override():
+        with Session(dataset_engine) as session:
+            yield session
+
+    async def async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = app.dependency_overrides[get_read_session] = session_override
+    app.dependency_overrides[get_async_session] = app.dependency_overrides[get_async_read_session] = async_session_override
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("route", ROUTES)
+def bench_get_route(benchmark, client, size, route):
+    benchmark.group = f"api:{route}"
+
+    def call():
+        response = client.get(api_prefix + route)
+        assert response.status_code == 200, response.text
+        return response
+
+    benchmark.pedantic(call, setup=analytics_cache.invalidate, rounds=10, iterations=1)
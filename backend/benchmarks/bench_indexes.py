@@ -0,0 +1,106 @@
+"""
+Before/after timings for the attendance index set.
+
+Seeds a throwaway SQLite file with the current schema minus its secondary
+indexes, times the lookups that delete_by_date, merge_professor_names and
+per-professor / date-range queries issue, then applies
+migrations.create_indexes() and times them again.
+
+Run from backend/:
+  python -m benchmarks.bench_indexes --rows 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.db import migrations
+from app.models.attendance import Attendance
+
+PROFESSORS = ["Satish Sir (Dean)", "Raghu Sir", "Tanvi Mam", "Akanksha Mam", "Dhaval Sir", "Ritesh Mam", "Anoop Sir", "CM Sir", "Mahesh Sir"]
+SUBJECTS = ["Physiology", "Anatomy", "Samhita", "Padarth Vigyan", "Sanskrit (CM Sir)"]
+
+QUERIES = {
+    "by date (delete_by_date)": ("SELECT COUNT(*) FROM attendance WHERE date = :d", {"d": "2024-03-15"}),
+    "by professor (merge)": ("SELECT id FROM attendance WHERE professor = :p", {"p": "CM Sir"}),
+    "by subject": ("SELECT COUNT(*) FROM attendance WHERE subject = :s", {"s": "Samhita"}),
+    "date range (1 month)": (
+        "SELECT COUNT(*) FROM attendance WHERE date BETWEEN :a AND :b",
+        {"a": "2024-03-01", "b": "2024-03-31"},
+    ),
+    "professor+status+range": (
+        "SELECT COUNT(*) FROM attendance WHERE professor = :p AND status = 'Present' AND date >= :a",
+        {"p": "Raghu Sir", "a": "2024-01-01"},
+    ),
+}
+
+
+def seed(engine, rows: int, rng: random.Random) -> None:
+    Attendance.__table__.create(engine)
+    for index in Attendance.__table__.indexes:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    start = date(2020, 7, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append(
+                {
+                    "date": (start + timedelta(days=rng.randrange(2000))).isoformat(),
+                    "timestamp": "10:00:00",
+                    "subject": rng.choice(SUBJECTS),
+                    "professor": rng.choice(PROFESSORS),
+                    "status": "Present" if rng.random() < 0.8 else "Absent",
+                    "count": 1,
+                }
+            )
+            if len(batch) == 10_000 or i == rows - 1:
+                conn.execute(Attendance.__table__.insert(), batch)
+                batch = []
+
+
+def time_queries(engine, repeat: int = 5) -> dict[str, float]:
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                best = min(best, time.perf_counter() - started)
+            results[name] = best
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_indexes.db")
+    engine = create_engine(f"sqlite:///{path}")
+    seed(engine, args.rows, random.Random(20260228))
+
+    before = time_queries(engine)
+    started = time.perf_counter()
+    created = migrations.create_indexes(engine)
+    build_time = time.perf_counter() - started
+    after = time_queries(engine)
+
+    print(f"{args.rows} rows; built {len(created)} indexes in {build_time:.2f}s")
+    print(f"{'query':<26} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for name in QUERIES:
+        b, a = before[name] * 1000, after[name] * 1000
+        print(f"{name:<26} {b:>10.2f} {a:>10.2f} {b / a if a else float('inf'):>7.1f}x")
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Scaling benchmark for monthly_snapshots().
+
+Generates synthetic attendance spanning 1, 2, 4 and 8 academic years at a fixed
+number of classes per day and times monthly_snapshots() on each. The
+per-row cost should stay flat as history grows (linear scaling); the old
+per-month re-filter grew with months x rows.
+
+Run from backend/:
+  python -m benchmarks.bench_monthly_snapshots
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import date, timedelta
+
+from app.models.attendance import Attendance
+from app.services.analytics import monthly_snapshots
+
+SUBJECT_PROFESSORS = {
+    "Physiology": ["Anoop Sir", "Ritesh Mam"],
+    "Anatomy": ["Raghu Sir", "Akanksha Mam", "Tanvi Mam"],
+    "Samhita": ["Satish Sir (Dean)", "Dhaval Sir", "Mahesh Sir"],
+    "Padarth Vigyan": ["Satish Sir (Dean)", "Dhaval Sir", "Mahesh Sir"],
+    "Sanskrit (CM Sir)": ["CM Sir"],
+}
+CLASSES_PER_DAY = 6
+START = date(2018, 7, 1)
+
+
+def build_rows(years: int, rng: random.Random) -> list[Attendance]:
+    subjects = list(SUBJECT_PROFESSORS)
+    rows: list[Attendance] = []
+    for offset in range(years * 365):
+        day = (START + timedelta(days=offset)).isoformat()
+        for _ in range(CLASSES_PER_DAY):
+            subject = rng.choice(subjects)
+            rows.append(
+                Attendance(
+                    date=day,
+                    timestamp="10:00:00",
+                    subject=subject,
+                    professor=rng.choice(SUBJECT_PROFESSORS[subject]),
+                    status="Present" if rng.random() < 0.8 else "Absent",
+                )
+            )
+    return rows
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rng = random.Random(20260228)
+    print(f"{'years':>5} {'rows':>9} {'months':>6} {'ms':>9} {'ns/row':>8}")
+    for years in (1, 2, 4, 8):
+        rows = build_rows(years, rng)
+        months = len(monthly_snapshots(rows))
+        elapsed = _best_of(lambda: monthly_snapshots(rows))
+        print(f"{years:>5} {len(rows):>9} {months:>6} {elapsed * 1000:>9.1f} {elapsed * 1e9 / len(rows):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold-start budget: import time of app.main and first-request latency.
+
+Each run is a fresh interpreter, as on a serverless cold start. It records
+the wall time to import app.main, the first /health response, and the first
+DB-backed response, plus the slowest modules from ``python -X importtime``.
+With --history the medians are appended as one JSON line, tagged with the
+git revision, so the numbers can be tracked from commit to commit.
+
+Run from backend/:
+  python -m benchmarks.bench_startup --runs 5
+  python -m benchmarks.bench_startup --runs 5 --history benchmarks/.baselines/startup.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+client_ready = time.perf_counter()
+client.get(app.main.api_prefix + "/health").raise_for_status()
+health = time.perf_counter()
+client.get(app.main.api_prefix + "/dashboard/summary").raise_for_status()
+summary = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_health_ms": (health - client_ready) * 1000,
+    "first_summary_ms": (summary - health) * 1000,
+}))
+"""
+
+
+def _importtime(env: dict, top: int) -> list[tuple[str, float]]:
+    # -X importtime writes "import time: self | cumulative | module" lines to stderr.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us) / 1000))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:top]
+
+
+def _revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules (self time) to list.")
+    parser.add_argument("--history", help="Append the medians as a JSON line to this file.")
+    args = parser.parse_args()
+
+    from generate_load_data import generate_rows, load_sqlite
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.db")
+        load_sqlite(path, generate_rows(2_000, seed=7))
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{path}"}
+
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True)
+            runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        slowest = _importtime(env, args.top)
+
+    medians = {key: round(statistics.median(run[key] for run in runs), 1) for key in runs[0]}
+    print(f"{args.runs} cold starts (median):")
+    for key, value in medians.items():
+        print(f"  {key:<18} {value:>8.1f}")
+    print("slowest imports (self ms):")
+    for name, ms in slowest:
+        print(f"  {ms:>8.1f}  {name}")
+
+    if args.history:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        entry = {"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "rev": _revision(), "runs": args.runs, **medians}
+        with open(args.history, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry) + "\n")
+        print(f"appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Shared fixtures for the pytest-benchmark suite.
+
+Each dataset size is generated once per session with generate_load_data.py
+(fixed seed) into a local SQLite file, so numbers are comparable run to run.
+
+Run from backend/ (requires requirements-bench.txt):
+  python -m pytest benchmarks                                   # time everything
+  python -m pytest benchmarks --bench-sizes 1000,10000          # pick dataset sizes
+  python -m pytest benchmarks --benchmark-save=baseline         # store a JSON baseline
+  python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15%
+      # compare with the latest saved run and fail on a >15% mean regression
+"""
+
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, select
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.attendance import Attendance  # noqa: E402
+from generate_load_data import generate_rows, load_sqlite  # noqa: E402
+
+SEED = 20260228
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-sizes",
+        default="1000,10000,100000",
+        help="Comma-separated dataset sizes (classes) to benchmark.",
+    )
+    parser.addoption(
+        "--bench-data-dir",
+        default=os.path.join(os.path.dirname(__file__), ".data"),
+        help="Where generated SQLite datasets are cached between runs.",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("--bench-sizes").split(",") if s.strip()]
+        metafunc.parametrize("size", sizes, scope="session")
+
+
+@pytest.fixture(scope="session")
+def dataset_path(request, size):
+    data_dir = request.config.getoption("--bench-data-dir")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"attendance_{size}_{SEED}.db")
+    if not os.path.exists(path):
+        tmp = f"{path}.tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        load_sqlite(tmp, generate_rows(size, seed=SEED))
+        os.replace(tmp, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def dataset_engine(dataset_path):
+    engine = create_engine(f"sqlite:///{dataset_path}", connect_args={"check_same_thread": False})
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def records(dataset_engine):
+    with Session(dataset_engine) as session:
+        return session.exec(select(Attendance).order_by(Attendance.date.asc())).all()
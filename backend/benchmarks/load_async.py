@@ -0,0 +1,124 @@
+"""
+Concurrency load test: sync threadpool handlers vs ASYNC_DB handlers.
+
+Generates a SQLite dataset, then for each mode starts a child process with
+the app configured for that mode and fires --requests requests per
+concurrency level through an in-process ASGI client. --latency-ms adds a
+simulated network round trip to every statement, which is what a remote
+Turso database costs: the sync path sleeps its worker thread, the async
+path awaits. The response cache is disabled so every request reaches the DB.
+
+Run from backend/:
+  python -m benchmarks.load_async --latency-ms 20 --concurrency 1,16,64,128
+  python -m benchmarks.load_async --routes /attendance,/dashboard/summary --latency-ms 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = {"sync": "false", "async": "true"}
+
+
+def _install_latency(seconds: float) -> None:
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+
+    from app.db import engine as db
+
+    if db.settings.async_db:
+        @event.listens_for(db.get_async_engine().sync_engine, "before_cursor_execute")
+        def _async_round_trip(*_):
+            await_only(asyncio.sleep(seconds))
+    else:
+        @event.listens_for(db.get_engine(), "before_cursor_execute")
+        def _sync_round_trip(*_):
+            time.sleep(seconds)
+
+
+async def _run_level(client, routes: list[str], requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(routes[i % len(routes)])
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+
+async def _child(args) -> None:
+    import httpx
+
+    from app.main import api_prefix, app
+
+    if args.latency_ms:
+        _install_latency(args.latency_ms / 1000)
+    routes = [api_prefix + route for route in args.routes.split(",")]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        await client.get(routes[0])  # warm the pool and imports
+        results = [
+            await _run_level(client, routes, args.requests, int(level)) for level in args.concurrency.split(",")
+        ]
+    print(json.dumps(results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="Classes in the generated dataset.")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per concurrency level.")
+    parser.add_argument("--concurrency", default="1,16,64,128")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated DB round trip per statement.")
+    parser.add_argument("--routes", default="/attendance,/meta/count")
+    parser.add_argument("--pool-size", type=int, default=128, help="DB_POOL_SIZE for both modes.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(_child(args))
+        return
+
+    from generate_load_data import generate_rows, load_sqlite
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.db")
+        load_sqlite(path, generate_rows(args.rows, seed=7))
+        print(f"dataset: {args.rows} classes, latency {args.latency_ms}ms/statement, routes {args.routes}")
+        print(f"{'mode':<6} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        for mode, flag in MODES.items():
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{path}",
+                "ASYNC_DB": flag,
+                "ANALYTICS_CACHE_SIZE": "0",
+                "PERF_TIMING": "false",
+                "DB_POOL_SIZE": str(args.pool_size),
+            }
+            child = [sys.executable, "-m", "benchmarks.load_async", "--child", *sys.argv[1:]]
+            output = subprocess.run(child, env=env, check=True, capture_output=True, text=True).stdout
+            for row in json.loads(output.strip().splitlines()[-1]):
+                print(f"{mode:<6} {row['concurrency']:>5} {row['rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Synthetic attendance generator for benchmarking and profiling.
+
+Extends the idea behind seed_legacy_data.py from a few hundred rows for one
+term to realistic multi-year history:
+- --years academic years with two semesters (mid-July to November, January
+  to mid-May), Sundays and random holidays off. Periods per teaching day grow
+  with --rows (at least six, like a real timetable; larger targets behave like
+  parallel sections) so history length stays realistic at any size.
+- A per-semester weekly timetable mapping periods to subjects and professors;
+  about 8% of periods are logged in subject mode ("Unspecified" professor).
+- Per-subject attendance rates with weekday (Saturday dip) and exam-month
+  effects, so percentages, streaks and monthly deltas look like real data.
+- Deterministic for a given --seed; rows are produced by a generator and
+  written in batches, so 10M rows never sit in memory at once.
+
+Outputs (either or both):
+  --sqlite PATH  bulk-load via executemany into a SQLite file with the app schema
+  --csv PATH     export the same rows as CSV (date,timestamp,subject,professor,status,count)
+
+Run:
+  python generate_load_data.py --rows 1000000 --seed 7 --sqlite ./load_1m.db
+  python generate_load_data.py --rows 50000 --csv ./load_50k.csv --weighted
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterator
+
+from sqlalchemy import create_engine, event
+
+from app.db.migrations import create_indexes
+from app.models.attendance import Attendance, ProfessorAlias, date_columns
+
+SUBJECT_PROFESSORS = {
+    "Physiology": ["Anoop Sir", "Ritesh Mam"],
+    "Anatomy": ["Raghu Sir", "Akanksha Mam", "Tanvi Mam"],
+    "Samhita": ["Satish Sir (Dean)", "Dhaval Sir", "Mahesh Sir"],
+    "Padarth Vigyan": ["Satish Sir (Dean)", "Dhaval Sir", "Mahesh Sir"],
+    "Sanskrit (CM Sir)": ["CM Sir"],
+}
+
+MIN_PERIODS = 6
+SEMESTERS = (((7, 15), (11, 30)), ((1, 5), (5, 15)))
+EXAM_MONTHS = {11, 5}
+SUBJECT_MODE_SHARE = 0.08
+HOLIDAY_SHARE = 0.04
+CSV_COLUMNS = ["date", "timestamp", "subject", "professor", "status", "count"]
+
+
+def _catalog(extra_professors: int, extra_subjects: int) -> dict[str, list[str]]:
+    catalog = {subject: list(profs) for subject, profs in SUBJECT_PROFESSORS.items()}
+    for i in range(extra_subjects):
+        catalog[f"Elective {i + 1}"] = []
+    subjects = list(catalog)
+    for i in range(extra_professors):
+        catalog[subjects[i % len(subjects)]].append(f"Visiting Prof {i + 1}")
+    for subject, profs in catalog.items():
+        if not profs:
+            profs.append(f"{subject} Faculty")
+    return catalog
+
+
+def _teaching_days(start_year: int, years: int, rng: random.Random) -> list[tuple[int, date]]:
+    """Teaching days (Monday-Saturday, minus random holidays) as (semester number, day)."""
+    days: list[tuple[int, date]] = []
+    semester = 0
+    for year in range(start_year, start_year + years):
+        for (m1, d1), (m2, d2) in SEMESTERS:
+            y = year + 1 if m1 < 7 else year
+            day, end = date(y, m1, d1), date(y, m2, d2)
+            while day <= end:
+                if day.weekday() != 6 and rng.random() >= HOLIDAY_SHARE:
+                    days.append((semester, day))
+                day += timedelta(days=1)
+            semester += 1
+    return days
+
+
+def _period_times(periods: int) -> list[str]:
+    # Spread periods across an 08:00-18:00 day.
+    step = 600 * 60 // periods
+    return [f"{(8 * 3600 + i * step) // 3600:02d}:{(i * step // 60) % 60:02d}:{(i * step) % 60:02d}" for i in range(periods)]
+
+
+def generate_rows(
+    rows: int,
+    seed: int = 20260228,
+    start_year: int = 2018,
+    years: int = 8,
+    extra_professors: int = 0,
+    extra_subjects: int = 0,
+    weighted: bool = False,
+) -> Iterator[dict]:
+    """Yield attendance value dicts until ``rows`` classes have been produced.
+
+    With ``weighted`` identical classes on the same day are folded into one
+    row with a ``count``, matching WEIGHTED_ROWS storage.
+    """
+    rng = random.Random(seed)
+    catalog = _catalog(extra_professors, extra_subjects)
+    subjects = list(catalog)
+    base_rate = {subject: rng.uniform(0.62, 0.92) for subject in subjects}
+    days = _teaching_days(start_year, years, rng)
+    periods = max(MIN_PERIODS, -(-rows // len(days)))
+    times = _period_times(periods)
+
+    produced = 0
+    current_semester = -1
+    timetable: dict[int, list[tuple[str, str]]] = {}
+    drift: dict[str, float] = {}
+    for semester, day in days:
+        if semester != current_semester:
+            current_semester = semester
+            timetable = {
+                weekday: [(subject, rng.choice(catalog[subject])) for subject in (rng.choice(subjects) for _ in times)]
+                for weekday in range(6)
+            }
+            drift = {subject: rng.uniform(-0.08, 0.08) for subject in subjects}
+
+        date_value = day.isoformat()
+        parts = date_columns(date_value)
+        day_rows: Counter = Counter()
+        for (subject, professor), timestamp in zip(timetable[day.weekday()], times):
+            if produced >= rows:
+                break
+            rate = base_rate[subject] + drift[subject]
+            if day.weekday() == 5:
+                rate -= 0.12
+            if day.month in EXAM_MONTHS:
+                rate += 0.06
+            status = "Present" if rng.random() < rate else "Absent"
+            if rng.random() < SUBJECT_MODE_SHARE:
+                professor = "Unspecified"
+            key = (times[0] if weighted else timestamp, subject, professor, status)
+            day_rows[key] += 1
+            produced += 1
+
+        for (timestamp, subject, professor, status), count in day_rows.items():
+            yield {
+                "date": date_value,
+                "timestamp": timestamp,
+                "subject": subject,
+                "professor": professor,
+                "status": status,
+                "count": count,
+                **parts,
+            }
+        if produced >= rows:
+            return
+
+
+def load_sqlite(path: str, rows: Iterator[dict], batch_size: int = 50_000) -> int:
+    """Create the app schema in ``path`` and executemany the rows in batches. Returns rows written."""
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def _fast_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    table = Attendance.__table__
+    table.create(engine, checkfirst=True)
+    ProfessorAlias.__table__.create(engine, checkfirst=True)
+    written = 0
+    batch: list[dict] = []
+    with engine.begin() as conn:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(table.insert(), batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            conn.execute(table.insert(), batch)
+            written += len(batch)
+    # Indexes after the load: building them once is far cheaper than maintaining them per insert.
+    create_indexes(engine)
+    # Closing the pool checkpoints the WAL so the .db file is complete on its own.
+    engine.dispose()
+    return written
+
+
+def write_csv(path: str, rows: Iterator[dict]) -> int:
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            written += 1
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of classes to generate.")
+    parser.add_argument("--seed", type=int, default=20260228)
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--years", type=int, default=8, help="Academic years of history to spread the rows over.")
+    parser.add_argument("--extra-professors", type=int, default=0)
+    parser.add_argument("--extra-subjects", type=int, default=0)
+    parser.add_argument("--weighted", action="store_true", help="Fold identical classes per day into weighted rows.")
+    parser.add_argument("--sqlite", help="SQLite file to create/append to.")
+    parser.add_argument("--csv", help="CSV file to write.")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    if not args.sqlite and not args.csv:
+        parser.error("pass --sqlite and/or --csv")
+
+    def rows() -> Iterator[dict]:
+        return generate_rows(
+            args.rows,
+            seed=args.seed,
+            start_year=args.start_year,
+            years=args.years,
+            extra_professors=args.extra_professors,
+            extra_subjects=args.extra_subjects,
+            weighted=args.weighted,
+        )
+
+    for target, writer in ((args.sqlite, lambda p: load_sqlite(p, rows(), args.batch_size)), (args.csv, lambda p: write_csv(p, rows()))):
+        if not target:
+            continue
+        started = time.perf_counter()
+        written = writer(target)
+        elapsed = time.perf_counter() - started
+        print(f"{target}: {written} rows ({args.rows} classes) in {elapsed:.1f}s, {written / elapsed:.0f} rows/s")
+
+    if args.sqlite:
+        print("If the API will run with USE_ROLLUP=true, run `python rebuild_rollup.py rebuild` against it.")
+
+
+if __name__ == "__main__":
+    main()
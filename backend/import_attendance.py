@@ -0,0 +1,75 @@
+"""
+Import attendance rows from a CSV file (the CLI twin of POST /attendance/import).
+
+Columns are matched by header: date, subject, professor and status are
+required, timestamp and count optional, so a file from /attendance/export
+can be loaded back as is. Rows are validated like POST /attendance and
+inserted in chunked executemany transactions (with the rollup when
+USE_ROLLUP=true). The file is read incrementally, so multi-hundred-MB files
+import in bounded memory. A failed chunk stops the import without undoing
+the chunks before it; rerun with the printed --skip-rows to continue.
+
+Run:
+  DATABASE_URL="sqlite:///./attendance_ultra.db" python import_attendance.py attendance.csv
+  DATABASE_URL="sqlite+libsql://<db>.turso.io" TURSO_AUTH_TOKEN="<token>" python import_attendance.py attendance.csv.gz --chunk-size 2000
+  python import_attendance.py attendance.csv --skip-rows 120000
+"""
+
+import argparse
+import gzip
+import sys
+
+from sqlmodel import Session
+
+from app.db.engine import engine
+from app.services.ingest import import_csv
+
+
+def _open(path: str):
+    if path == "-":
+        return open(sys.stdin.fileno(), encoding="utf-8-sig", newline="", closefd=False)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV file, .csv.gz, or - for stdin.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction (BULK_CHUNK_SIZE by default).")
+    parser.add_argument("--skip-rows", type=int, default=0, help="Data rows to skip, e.g. to resume after a failed chunk.")
+    args = parser.parse_args()
+
+    with _open(args.path) as lines, Session(engine) as session:
+        try:
+            reports = import_csv(session, lines, args.chunk_size, args.skip_rows)
+        except ValueError as exc:
+            print(exc, file=sys.stderr)
+            return 2
+        for report in reports:
+            print(
+                f"\r{report['rows']:>10} rows read  {report['inserted']:>10} inserted  "
+                f"{report['rejected']:>7} rejected  {report['rows_per_second'] or 0:>8} rows/s",
+                end="",
+                flush=True,
+            )
+    print()
+
+    for reject in report["rejects"]:
+        print(f"- line {reject['line']}: {reject['error']}")
+    if report["rejected"] > len(report["rejects"]):
+        print(f"  ... and {report['rejected'] - len(report['rejects'])} more rejected rows.")
+    print(f"Imported {report['inserted']} rows ({report['classes']} classes) in {report['elapsed_ms'] / 1000:.1f}s.")
+    failed = report["failed_chunk"]
+    if failed:
+        print(
+            f"Chunk at lines {failed['first_line']}-{failed['last_line']} failed: {failed['error']}\n"
+            f"Earlier chunks are committed; rerun with --skip-rows {report['resume_skip_rows']} to continue.",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,36 @@
+"""
+Stream the local attendance table into another database (normally Turso).
+
+- Reads the source in keyset-paginated chunks (WHERE id > :last ORDER BY id),
+  so memory stays flat however large the table is.
+- Writes each chunk as a multi-row INSERT ... VALUES (...), (...) in its own
+  transaction, split only where SQLite's bound-variable limit requires it.
+- Records the last fully migrated id in a checkpoint file; a rerun resumes
+  from there instead of starting over.
+- --on-conflict skip (default) ignores ids that already exist in the target,
+  upsert overwrites them, error keeps the old fail-fast behaviour. Skipped
+  rows are reported separately from rows actually written.
+- --workers N writes chunks in parallel (the checkpoint only advances past
+  chunks whose predecessors have all committed).
+
+Run `python migrate_schema.py` against the target afterwards to add indexes.
+
+Run:
+  DATABASE_URL="sqlite+libsql://your-db.turso.io" TURSO_AUTH_TOKEN="..." python migrate_local_to_cloud.py
+  python migrate_local_to_cloud.py --source sqlite:///./a.db --target sqlite:///./b.db --chunk-size 500
+"""
+
+import argparse
+import json
 import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
 from typing import Optional
-from sqlmodel import Field, SQLModel, Session, create_engine, select
+
+from sqlalchemy import inspect
+from sqlmodel import Field, SQLModel, create_engine, select
 
 # ---------------------------
 # Schema mirror (matches local attendance_ultra.db)
@@ -14,6 +44,14 @@ class Attendance(SQLModel, table=True):
     subject: Optional[str] = None
     professor: str
     status: str
+    count: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    day_ordinal: Optional[int] = None
+    idempotency_key: Optional[str] = None
+
+
+ON_CONFLICT_CHOICES = ("skip", "upsert", "error")
+# Bound parameters allowed per statement: SQLite's default since 3.32 (and libsql's), 999 before that.
+MAX_VARIABLES = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
 
 
 def _build_engine(database_url: str):
@@ -39,6 +77,8 @@ def _build_engine(database_url: str):
         # Local SQLite workaround for threading (only for local files)
         if "libsql" not in database_url:
             connect_args["check_same_thread"] = False
+            # Parallel writers against a local file wait for the lock instead of failing.
+            connect_args["timeout"] = 30
     
     # Turso / libsql token handling
     if "libsql" in database_url:
@@ -49,85 +89,183 @@ def _build_engine(database_url: str):
     return create_engine(database_url, connect_args=connect_args)
 
 
-def migrate():
-    # Local connection setup
-    # Assuming the script is run from the backend directory where the DB exists
-    local_url = "sqlite:///./attendance_ultra.db"
-    
-    # Cloud connection from environment variables
-    cloud_url = os.getenv("DATABASE_URL")
-    if not cloud_url:
-        print("❌ Error: DATABASE_URL is not set.")
+def _load_checkpoint(path: str, source_url: str, target_url: str) -> int:
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if data.get("source") != source_url or data.get("target") != target_url:
+        print(f"⚠️ Ignoring checkpoint {path}: it belongs to a different source/target pair.")
+        return 0
+    return int(data.get("last_id", 0))
+
+
+def _save_checkpoint(path: str, source_url: str, target_url: str, last_id: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"source": source_url, "target": target_url, "last_id": last_id}, fh)
+    os.replace(tmp, path)
+
+
+@lru_cache(maxsize=8)
+def _insert_sql(on_conflict: str, columns: tuple[str, ...], row_count: int) -> str:
+    """``INSERT ... VALUES (?, ...), (?, ...)`` for ``row_count`` rows, built once per batch shape.
+
+    Compiling a multi-row ``insert().values(rows)`` costs more than the write
+    itself at these sizes, so the statement text is cached and the rows are
+    bound as one flat parameter list.
+    """
+    row = f"({', '.join('?' for _ in columns)})"
+    sql = f"INSERT INTO {Attendance.__tablename__} ({', '.join(columns)}) VALUES {', '.join([row] * row_count)}"
+    if on_conflict == "skip":
+        sql += " ON CONFLICT (id) DO NOTHING"
+    elif on_conflict == "upsert":
+        updates = ", ".join(f"{name} = excluded.{name}" for name in columns if name != "id")
+        sql += f" ON CONFLICT (id) DO UPDATE SET {updates}"
+    return sql
+
+
+def _read_chunks(source_engine, columns: list[str], start_id: int, chunk_size: int):
+    table = Attendance.__table__
+    selected = [table.c[name] for name in columns]
+    last_id = start_id
+    with source_engine.connect() as conn:
+        while True:
+            rows = conn.execute(
+                select(*selected).where(table.c.id > last_id).order_by(table.c.id).limit(chunk_size)
+            ).mappings().all()
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            yield last_id, [dict(row) for row in rows]
+
+
+def _write_chunk(target_engine, on_conflict: str, columns: list[str], rows: list[dict]) -> tuple[int, int]:
+    """Write one chunk in a single transaction. Returns ``(rows read, rows written)``."""
+    per_statement = max(MAX_VARIABLES // len(columns), 1)
+    written = 0
+    with target_engine.begin() as conn:
+        for start in range(0, len(rows), per_statement):
+            batch = rows[start:start + per_statement]
+            params = tuple(row[name] for row in batch for name in columns)
+            result = conn.exec_driver_sql(_insert_sql(on_conflict, tuple(columns), len(batch)), params)
+            # rowcount is SQLite's changes(): rows skipped by ON CONFLICT DO NOTHING are not counted.
+            written += result.rowcount if result.rowcount >= 0 else len(batch)
+    return len(rows), written
+
+
+def migrate(
+    source_url: str,
+    target_url: str,
+    chunk_size: int = 1000,
+    workers: int = 1,
+    on_conflict: str = "skip",
+    checkpoint_path: Optional[str] = ".migrate_checkpoint.json",
+    restart: bool = False,
+) -> dict:
+    """Copy ``attendance`` from source to target and return run statistics."""
+    source_engine = _build_engine(source_url)
+    target_engine = _build_engine(target_url)
+
+    # Older local files may predate count/day_ordinal; copy only what the source has.
+    source_columns = {column["name"] for column in inspect(source_engine).get_columns("attendance")}
+    columns = [c.name for c in Attendance.__table__.columns if c.name in source_columns]
+
+    SQLModel.metadata.create_all(target_engine)
+
+    start_id = 0 if restart or not checkpoint_path else _load_checkpoint(checkpoint_path, source_url, target_url)
+    if start_id:
+        print(f"↪️ Resuming after id {start_id} (checkpoint {checkpoint_path}).")
+
+    migrated = 0
+    written = 0
+    checkpoint = start_id
+    started = time.perf_counter()
+    # Chunks in submission order; the checkpoint may only move past a chunk once
+    # every earlier chunk has committed too.
+    pending: list[tuple[int, Future]] = []
+
+    def settle(block: bool) -> None:
+        nonlocal migrated, written, checkpoint
+        if block and pending:
+            wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+        while pending and pending[0][1].done():
+            last_id, future = pending.pop(0)
+            read, landed = future.result()
+            migrated += read
+            written += landed
+            checkpoint = last_id
+            if checkpoint_path:
+                _save_checkpoint(checkpoint_path, source_url, target_url, checkpoint)
+            elapsed = time.perf_counter() - started
+            print(
+                f"📦 {migrated} rows copied (up to id {checkpoint}): {written} written, {migrated - written} skipped, "
+                f"{migrated / elapsed if elapsed else 0:.0f} rows/s"
+            )
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for last_id, rows in _read_chunks(source_engine, columns, start_id, chunk_size):
+            pending.append((last_id, pool.submit(_write_chunk, target_engine, on_conflict, columns, rows)))
+            while len(pending) >= max(workers, 1) * 2:
+                settle(block=True)
+            settle(block=False)
+        while pending:
+            settle(block=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": migrated,
+        "written": written,
+        "skipped": migrated - written,
+        "last_id": checkpoint,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(migrated / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="sqlite:///./attendance_ultra.db")
+    parser.add_argument("--target", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--on-conflict", choices=ON_CONFLICT_CHOICES, default="skip")
+    parser.add_argument("--checkpoint", default=".migrate_checkpoint.json")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start from the first id.")
+    args = parser.parse_args()
+
+    if not args.target:
+        print("❌ Error: no target. Set DATABASE_URL or pass --target.")
         print("Usage: DATABASE_URL=\"sqlite+libsql://your-db.turso.io\" TURSO_AUTH_TOKEN=\"...\" python migrate_local_to_cloud.py")
         return
 
     print("=" * 70)
     print("🚀 MIGRATION: Local SQLite -> Turso Cloud")
-    print(f"Local DB Path: ./attendance_ultra.db")
-    print(f"Cloud URL:     {cloud_url}")
+    print(f"Source:  {args.source}")
+    print(f"Target:  {args.target}")
+    print(f"Chunks:  {args.chunk_size} rows, {args.workers} writer(s), on conflict: {args.on_conflict}")
     print("=" * 70)
 
-    # Initialize engines
-    local_engine = _build_engine(local_url)
-    cloud_engine = _build_engine(cloud_url)
-
-    # 1. Fetch rows from local database
-    print("\n[Step 1/3] Reading data from local database...")
     try:
-        with Session(local_engine) as local_session:
-            statement = select(Attendance)
-            local_rows = local_session.exec(statement).all()
-            total_rows = len(local_rows)
-            print(f"✅ Found {total_rows} rows in local 'attendance' table.")
+        stats = migrate(
+            args.source,
+            args.target,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            on_conflict=args.on_conflict,
+            checkpoint_path=args.checkpoint,
+            restart=args.restart,
+        )
     except Exception as e:
-        print(f"❌ Error reading local DB: {e}")
+        print(f"❌ Migration stopped: {e}")
+        print(f"Committed chunks are kept; rerun to resume from {args.checkpoint}.")
         return
 
-    if total_rows == 0:
-        print("⚠️ No data found to migrate.")
-        return
-
-    # 2. Ensure table exists in cloud
-    print("\n[Step 2/3] Ensuring 'attendance' table exists in Turso...")
-    try:
-        SQLModel.metadata.create_all(cloud_engine)
-    except Exception as e:
-        print(f"❌ Error creating cloud table: {e}")
-        return
-
-    # 3. Migrate data to cloud
-    print(f"\n[Step 3/3] Migrating {total_rows} entries to Turso...")
-    try:
-        with Session(cloud_engine) as cloud_session:
-            for i, row in enumerate(local_rows, 1):
-                # Create a fresh copy to insert into the cloud session
-                # We preserve the original ID for data integrity
-                new_row = Attendance(
-                    id=row.id,
-                    date=row.date,
-                    timestamp=row.timestamp,
-                    subject=row.subject,
-                    professor=row.professor,
-                    status=row.status
-                )
-                cloud_session.add(new_row)
-                
-                # Print progress every 100 rows
-                if i % 100 == 0 or i == total_rows:
-                    print(f"📦 Staged {i}/{total_rows} rows...")
-
-            print("💾 Committing changes to Turso Cloud (this may take a moment)...")
-            cloud_session.commit()
-            print(f"✨ Success! All {total_rows} rows have been migrated.")
-    except Exception as e:
-        print(f"❌ Error during data insertion: {e}")
-        print("\nTIP: If you get a 'Primary Key' error, it means the cloud DB already has data.")
-        print("This script is designed for a one-time migration to an empty cloud database.")
-
-    print("\n" + "=" * 70)
-    print("Migration Checkpoint Complete.")
-    print("=" * 70)
+    print(
+        f"✨ Done: {stats['rows']} rows read, {stats['written']} written, {stats['skipped']} skipped "
+        f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/s), last id {stats['last_id']}."
+    )
 
 
 if __name__ == "__main__":
-    migrate()
+    main()
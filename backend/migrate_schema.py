@@ -0,0 +1,61 @@
+"""
+Bring an existing attendance database up to the current schema.
+
+Every step is idempotent, so this is safe to re-run against local SQLite or
+Turso and replaces the need to call init_db() at startup.
+
+Run:
+  DATABASE_URL="sqlite:///./attendance_ultra.db" python migrate_schema.py
+  DATABASE_URL="sqlite+libsql://<db>.turso.io" TURSO_AUTH_TOKEN="<token>" python migrate_schema.py --collapse-duplicates
+  DATABASE_URL="sqlite+libsql://<db>.turso.io" TURSO_AUTH_TOKEN="<token>" python migrate_schema.py --change-log
+"""
+
+import argparse
+
+from app.db import migrations
+from app.db.engine import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--collapse-duplicates",
+        action="store_true",
+        help="Fold identical (date, timestamp, subject, professor, status) rows into weighted rows.",
+    )
+    parser.add_argument(
+        "--change-log",
+        action="store_true",
+        help="Record attendance row changes in attendance_changes so REPLICA_PATH replicas can sync incrementally.",
+    )
+    args = parser.parse_args()
+
+    added = migrations.add_count_column(engine)
+    print(f"attendance.count column: {'added' if added else 'already present'}")
+
+    added = migrations.add_idempotency_column(engine)
+    print(f"attendance.idempotency_key column: {'added' if added else 'already present'}")
+
+    added_columns = migrations.add_date_columns(engine)
+    print(f"Date columns added: {', '.join(added_columns) if added_columns else 'none (all present)'}")
+    filled = migrations.backfill_date_columns(engine)
+    print(f"Backfilled derived date columns for {filled} dates.")
+
+    created_aliases = migrations.create_alias_table(engine)
+    print(f"professor_aliases table: {'created' if created_aliases else 'already present'}")
+
+    created = migrations.create_indexes(engine)
+    print(f"Indexes created: {', '.join(created) if created else 'none (all present)'}")
+
+    if args.change_log:
+        triggers = migrations.create_change_log(engine)
+        print(f"Change-log triggers created: {', '.join(triggers) if triggers else 'none (all present)'}")
+
+    if args.collapse_duplicates:
+        removed = migrations.collapse_duplicates(engine)
+        print(f"Collapsed duplicate rows: {removed} removed.")
+        print("If USE_ROLLUP=true, run `python rebuild_rollup.py verify` to confirm totals are unchanged.")
+
+
+if __name__ == "__main__":
+    main()
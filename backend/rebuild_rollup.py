@@ -0,0 +1,46 @@
+"""
+Rebuild or verify the attendance_daily_rollup table.
+
+The rollup holds one count per (date, professor, subject, status) and is kept
+up to date by the write routes once USE_ROLLUP=true. Existing databases need a
+one-time rebuild before the flag is switched on; `verify` can be run at any
+time to confirm the rollup still matches the raw table.
+
+Run:
+  DATABASE_URL="sqlite:///./attendance_ultra.db" python rebuild_rollup.py rebuild
+  DATABASE_URL="sqlite+libsql://<db>.turso.io" TURSO_AUTH_TOKEN="<token>" python rebuild_rollup.py verify
+"""
+
+import argparse
+import sys
+
+from sqlmodel import Session
+
+from app.db.engine import engine
+from app.services import rollup
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        if args.command == "rebuild":
+            groups = rollup.rebuild(session)
+            print(f"Rebuilt attendance_daily_rollup: {groups} groups.")
+            return 0
+
+        mismatches = rollup.verify(session)
+        if not mismatches:
+            print("attendance_daily_rollup matches the attendance table.")
+            return 0
+        print(f"Found {len(mismatches)} mismatching groups:")
+        for m in mismatches[:50]:
+            print(f"- {m['date']} {m['professor']} / {m['subject']} {m['status']}: expected {m['expected']}, found {m['actual']}")
+        print("Run `python rebuild_rollup.py rebuild` to repair.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
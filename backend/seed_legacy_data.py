@@ -5,6 +5,7 @@ Purpose:
 - Backfill baseline data snapshot (as of 2026-02-28) into the attendance table.
 - Generates row-level entries distributed across 2025-11-01 to 2026-02-28.
 - Uses professor-level rows to match app schema.
+- Stores one weighted row (count=N) per (date, professor, status) instead of N identical rows.
 
 Run:
   DATABASE_URL="sqlite:///./attendance_ultra.db" python seed_legacy_data.py
@@ -15,10 +16,12 @@ from __future__ import annotations
 
 import os
 import random
+from collections import Counter
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from typing import Any
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Session, create_engine
 
 
@@ -27,12 +30,17 @@ from sqlmodel import Field, SQLModel, Session, create_engine
 # ---------------------------
 class Attendance(SQLModel, table=True):
     __tablename__ = "attendance"
+    __table_args__ = (Index("ux_attendance_idempotency_key", "idempotency_key", unique=True),)
 
     id: int | None = Field(default=None, primary_key=True)
     date: str
     timestamp: str
+    subject: str | None = None
     professor: str
     status: str
+    count: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
+    day_ordinal: int | None = None
+    idempotency_key: str | None = None
 
 
 # ---------------------------
@@ -163,34 +171,39 @@ def main() -> None:
         professors = SUBJECT_PROFESSORS[item.subject]
         row_dates = _pick_dates_even_random(item.count, START_DATE, END_DATE, rng)
 
+        # Classes landing on the same day with the same professor collapse into one weighted row.
+        weights: Counter[tuple[date, str]] = Counter()
         for d in row_dates:
-            prof = rng.choice(professors)
+            weights[(d, rng.choice(professors))] += 1
+            progress += 1
+            if progress % 100 == 0 or progress == planned_total:
+                print(f"Generated {progress}/{planned_total} rows...")
+
+        for (d, prof), count in weights.items():
             rows.append(
                 Attendance(
                     date=d.isoformat(),
                     timestamp=_random_time(rng),
+                    subject=item.subject,
                     professor=prof,
                     status=item.status,
+                    count=count,
+                    day_ordinal=d.toordinal(),
                 )
             )
-            progress += 1
-            if progress % 100 == 0 or progress == planned_total:
-                print(f"Generated {progress}/{planned_total} rows...")
 
     print("\nInserting rows into database...")
-    with Session(engine) as session:
+    # The summary below reads the rows back after commit; keep their attributes loaded.
+    with Session(engine, expire_on_commit=False) as session:
         session.add_all(rows)
         session.commit()
-    print(f"Inserted {len(rows)} rows successfully.")
+    print(f"Inserted {len(rows)} weighted rows ({sum(r.count for r in rows)} classes) successfully.")
 
     # Post-insert summary (raw)
-    print("\nRaw rows inserted per subject group:")
+    print("\nClasses inserted per subject group:")
     subject_totals: dict[str, int] = {k: 0 for k in LEGACY_SUBJECT_COUNTS}
     for r in rows:
-        for subject, profs in SUBJECT_PROFESSORS.items():
-            if r.professor in profs:
-                subject_totals[subject] += 1
-                break
+        subject_totals[r.subject] += r.count
     for subject, cnt in subject_totals.items():
         print(f"- {subject:<28}: {cnt}")
 
@@ -1,8 +1,8 @@
 import { InsightsView } from "@/components/insights-view";
-import { getDashboardSummary, getMonthlySnapshots } from "@/lib/api";
+import { getDashboardBundle } from "@/lib/api";
 
 export default async function InsightsPage() {
-  const [summary, snapshots] = await Promise.all([getDashboardSummary(), getMonthlySnapshots()]);
+  const { summary, monthly: snapshots } = await getDashboardBundle(["summary", "monthly"]);
   return <InsightsView summary={summary} snapshots={snapshots} />;
 }
 
@@ -1,7 +1,7 @@
 import { DashboardView } from "@/components/dashboard-view";
-import { getCumulativeSubjects, getDashboardSummary } from "@/lib/api";
+import { getDashboardBundle } from "@/lib/api";
 
 export default async function HomePage() {
-  const [summary, cumulative] = await Promise.all([getDashboardSummary(), getCumulativeSubjects()]);
+  const { summary, cumulative } = await getDashboardBundle(["summary", "cumulative"]);
   return <DashboardView summary={summary} cumulativeSubjects={cumulative} />;
 }
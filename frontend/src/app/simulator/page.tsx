@@ -1,8 +1,8 @@
 import { SimulatorView } from "@/components/simulator-view";
-import { getSimulatorSubjects } from "@/lib/api";
+import { getDashboardBundle } from "@/lib/api";
 
 export default async function SimulatorPage() {
-  const subjects = await getSimulatorSubjects();
+  const { simulator: subjects } = await getDashboardBundle(["simulator"]);
   return <SimulatorView subjects={subjects} />;
 }
 
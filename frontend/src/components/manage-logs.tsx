@@ -2,29 +2,73 @@
 
 import { useEffect, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
-import { Trash2, Calendar, User, CheckCircle2, XCircle, BookOpen } from "lucide-react";
-import { getAttendanceLogs, deleteAttendanceLog } from "@/lib/api";
+import { Trash2, Calendar, User, CheckCircle2, XCircle, BookOpen, Download } from "lucide-react";
+import { getAttendanceLogs, deleteAttendanceLog, attendanceExportUrl, type AttendanceLogFilters } from "@/lib/api";
+
+const PROFESSORS = [
+  "Satish Sir (Dean)",
+  "Raghu Sir",
+  "Tanvi Mam",
+  "Akanksha Mam",
+  "Dhaval Sir",
+  "Ritesh Mam",
+  "Anoop Sir",
+  "CM Sir",
+  "Mahesh Sir"
+];
+
+const SUBJECTS = [
+  "Physiology",
+  "Anatomy",
+  "Samhita",
+  "Padarth Vigyan",
+  "Sanskrit (CM Sir)"
+];
+
+const FILTER_CLASS =
+  "rounded-xl border border-slate-200/50 bg-white/70 px-3 py-2 text-xs font-medium shadow-sm focus:border-violet-500 focus:outline-none focus:ring-1 focus:ring-violet-500 dark:border-white/10 dark:bg-white/5";
 
 type AttendanceRecord = {
-  id: number;
+  // null while the entry is still in the server's write-behind journal.
+  id: number | null;
+  idempotency_key?: string | null;
+  pending?: boolean;
   date: string;
   timestamp: string;
   subject: string;
   professor: string;
   status: "Present" | "Absent";
+  count?: number;
 };
 
 export function ManageLogs() {
   const [logs, setLogs] = useState<AttendanceRecord[]>([]);
   const [loading, setLoading] = useState(true);
+  const [filters, setFilters] = useState<AttendanceLogFilters>({});
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   async function fetchLogs() {
     setLoading(true);
-    const data = await getAttendanceLogs();
-    setLogs(data || []);
+    const page = await getAttendanceLogs(filters);
+    setLogs(page.items);
+    setNextCursor(page.next_cursor);
     setLoading(false);
   }
 
+  async function loadMore() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    const page = await getAttendanceLogs(filters, nextCursor);
+    setLogs((prev) => [...prev, ...page.items]);
+    setNextCursor(page.next_cursor);
+    setLoadingMore(false);
+  }
+
+  function setFilter(key: keyof AttendanceLogFilters, value: string) {
+    setFilters((prev) => ({ ...prev, [key]: value || undefined }));
+  }
+
   async function deleteLog(id: number) {
     const success = await deleteAttendanceLog(id);
     if (success) {
@@ -34,12 +78,39 @@ export function ManageLogs() {
 
   useEffect(() => {
     fetchLogs();
-  }, []);
+  }, [filters]);
+
+  const filterBar = (
+    <div className="flex flex-wrap items-center gap-2">
+      <input type="date" aria-label="From" value={filters.from ?? ""} onChange={(e) => setFilter("from", e.target.value)} className={FILTER_CLASS} />
+      <input type="date" aria-label="To" value={filters.to ?? ""} onChange={(e) => setFilter("to", e.target.value)} className={FILTER_CLASS} />
+      <select aria-label="Professor" value={filters.professor ?? ""} onChange={(e) => setFilter("professor", e.target.value)} className={FILTER_CLASS}>
+        <option value="">All professors</option>
+        {PROFESSORS.map((name) => (
+          <option key={name} value={name}>{name}</option>
+        ))}
+      </select>
+      <select aria-label="Subject" value={filters.subject ?? ""} onChange={(e) => setFilter("subject", e.target.value)} className={FILTER_CLASS}>
+        <option value="">All subjects</option>
+        {SUBJECTS.map((name) => (
+          <option key={name} value={name}>{name}</option>
+        ))}
+      </select>
+      <select aria-label="Status" value={filters.status ?? ""} onChange={(e) => setFilter("status", e.target.value)} className={FILTER_CLASS}>
+        <option value="">Any status</option>
+        <option value="Present">Present</option>
+        <option value="Absent">Absent</option>
+      </select>
+    </div>
+  );
 
   if (loading) {
     return (
-      <div className="flex h-64 items-center justify-center font-mono text-sm text-slate-500">
-        Loading attendance history...
+      <div className="space-y-4">
+        {filterBar}
+        <div className="flex h-64 items-center justify-center font-mono text-sm text-slate-500">
+          Loading attendance history...
+        </div>
       </div>
     );
   }
@@ -48,11 +119,22 @@ export function ManageLogs() {
     <div className="space-y-4">
       <div className="flex items-center justify-between">
         <h2 className="text-xl font-bold tracking-tight">Manage History</h2>
-        <div className="rounded-full bg-white/5 px-3 py-1 text-[10px] font-black uppercase tracking-widest text-slate-500">
-          {logs.length} Entries
+        <div className="flex items-center gap-2">
+          <a
+            href={attendanceExportUrl(filters)}
+            className="flex items-center gap-1.5 rounded-full bg-white/5 px-3 py-1 text-[10px] font-black uppercase tracking-widest text-slate-500 transition hover:bg-white/10"
+          >
+            <Download size={12} />
+            CSV
+          </a>
+          <div className="rounded-full bg-white/5 px-3 py-1 text-[10px] font-black uppercase tracking-widest text-slate-500">
+            {logs.length}{nextCursor ? "+" : ""} Entries
+          </div>
         </div>
       </div>
 
+      {filterBar}
+
       {/* Desktop Table */}
       <div className="hidden overflow-hidden rounded-2xl border border-white/10 bg-white/5 md:block">
         <table className="w-full border-collapse text-left text-sm">
@@ -67,7 +149,7 @@ export function ManageLogs() {
           </thead>
           <tbody className="divide-y divide-white/5">
             {logs.map((log) => (
-              <tr key={log.id} className="transition-colors hover:bg-white/5">
+              <tr key={log.id ?? log.idempotency_key} className="transition-colors hover:bg-white/5">
                 <td className="px-5 py-4 font-mono text-xs">
                   <div className="font-bold">{log.date}</div>
                   <div className="text-slate-500">{log.timestamp}</div>
@@ -88,16 +170,21 @@ export function ManageLogs() {
                     }`}>
                       {log.status === "Present" ? <CheckCircle2 size={12} /> : <XCircle size={12} />}
                       {log.status}
+                      {(log.count ?? 1) > 1 && ` ×${log.count}`}
                     </span>
                   </div>
                 </td>
                 <td className="px-5 py-4 text-right">
-                  <button 
-                    onClick={() => deleteLog(log.id)}
-                    className="touch-target rounded-xl p-2 text-slate-500 transition hover:bg-rose-500/20 hover:text-rose-500 active:scale-90"
-                  >
-                    <Trash2 size={18} />
-                  </button>
+                  {log.id === null ? (
+                    <span className="font-mono text-[10px] font-black uppercase tracking-widest text-slate-500">Syncing</span>
+                  ) : (
+                    <button 
+                      onClick={() => deleteLog(log.id as number)}
+                      className="touch-target rounded-xl p-2 text-slate-500 transition hover:bg-rose-500/20 hover:text-rose-500 active:scale-90"
+                    >
+                      <Trash2 size={18} />
+                    </button>
+                  )}
                 </td>
               </tr>
             ))}
@@ -108,7 +195,7 @@ export function ManageLogs() {
       {/* Mobile Card List */}
       <div className="scrolling-touch grid grid-cols-1 gap-3 md:hidden">
         {logs.map((log) => (
-          <div key={log.id} className="glass-card hover-lift flex flex-col gap-4 p-5 sm:p-6 transition-all duration-300">
+          <div key={log.id ?? log.idempotency_key} className="glass-card hover-lift flex flex-col gap-4 p-5 sm:p-6 transition-all duration-300">
             <div className="flex items-start justify-between">
               <div className="flex flex-col">
                 <div className="flex items-center gap-2 font-mono text-[10px] sm:text-xs font-bold text-slate-500">
@@ -128,22 +215,40 @@ export function ManageLogs() {
               }`}>
                 {log.status === "Present" ? <CheckCircle2 size={16} /> : <XCircle size={16} />}
                 {log.status}
+                {(log.count ?? 1) > 1 && ` ×${log.count}`}
               </span>
             </div>
             
             <div className="flex items-center justify-end border-t border-slate-200/50 dark:border-white/5 pt-4 mt-2">
-              <button 
-                onClick={() => deleteLog(log.id)}
-                className="flex items-center gap-2 rounded-xl bg-rose-500/10 hover:bg-rose-500/20 px-5 py-3 text-xs sm:text-sm font-bold text-rose-600 dark:text-rose-400 transition-all active:scale-95 shadow-sm"
-              >
-                <Trash2 size={16} />
-                Delete Entry
-              </button>
+              {log.id === null ? (
+                <span className="px-5 py-3 font-mono text-[10px] sm:text-xs font-black uppercase tracking-widest text-slate-500">Syncing</span>
+              ) : (
+                <button 
+                  onClick={() => deleteLog(log.id as number)}
+                  className="flex items-center gap-2 rounded-xl bg-rose-500/10 hover:bg-rose-500/20 px-5 py-3 text-xs sm:text-sm font-bold text-rose-600 dark:text-rose-400 transition-all active:scale-95 shadow-sm"
+                >
+                  <Trash2 size={16} />
+                  Delete Entry
+                </button>
+              )}
             </div>
           </div>
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            type="button"
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="rounded-xl bg-white/5 px-5 py-2.5 text-xs font-bold uppercase tracking-widest text-slate-500 transition hover:bg-white/10 active:scale-95 disabled:opacity-50"
+          >
+            {loadingMore ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
+
       {logs.length === 0 && (
         <div className="flex h-48 flex-col items-center justify-center rounded-2xl border border-dashed border-white/10 bg-white/2 text-slate-500">
           <BookOpen size={32} className="mb-2 opacity-20" />
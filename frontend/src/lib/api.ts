@@ -1,4 +1,11 @@
-import { CumulativeSubjectCard, DashboardSummary, MonthlySnapshot, SubjectCard } from "@/types/dashboard";
+import {
+  BundleSection,
+  CumulativeSubjectCard,
+  DashboardBundle,
+  DashboardSummary,
+  MonthlySnapshot,
+  SubjectCard
+} from "@/types/dashboard";
 
 // If we are on Vercel, use the relative /api path that vercel.json routes to Python.
 // If we are on your local Mac, use the localhost FastAPI server.
@@ -24,6 +31,32 @@ const EMPTY_SUMMARY: DashboardSummary = {
   predictive_trajectory: { projected_percentage: 0 }
 };
 
+const EMPTY_BUNDLE: DashboardBundle = {
+  summary: EMPTY_SUMMARY,
+  simulator: [],
+  cumulative: [],
+  monthly: []
+};
+
+// One request (and one DB read on the backend) for every payload a page needs.
+export async function getDashboardBundle<S extends BundleSection>(
+  sections: S[]
+): Promise<Pick<DashboardBundle, S>> {
+  const query = encodeURIComponent(sections.join(","));
+  const fallback = Object.fromEntries(sections.map((s) => [s, EMPTY_BUNDLE[s]])) as Pick<DashboardBundle, S>;
+  try {
+    const res = await fetch(`${API_BASE}/dashboard/bundle?sections=${query}`, { next: { revalidate: 60 } });
+    if (!res.ok) {
+      console.error(`[API ERROR] /dashboard/bundle returned ${res.status}`);
+      return fallback;
+    }
+    return { ...fallback, ...(await res.json()) };
+  } catch (err) {
+    console.error(`[API CRASH] /dashboard/bundle failed:`, err);
+    return fallback;
+  }
+}
+
 export async function getDashboardSummary(): Promise<DashboardSummary> {
   try {
     // Rule: Use revalidate to protect Vercel Free Tier CPU limits
@@ -97,6 +130,10 @@ export async function createAttendanceEntry(payload: {
   }
 }
 
+// The last batch that failed and the Idempotency-Key it was sent with. Submitting the same rows again is a
+// retry and reuses the key, so rows the server already stored before the failure are not logged twice.
+let unconfirmedBatch: { body: string; key: string } | null = null;
+
 export async function createBulkAttendance(
   rows: Array<{
     date: string;
@@ -107,13 +144,17 @@ export async function createBulkAttendance(
     absent: number;
   }>
 ): Promise<{ ok: boolean; inserted: number }> {
+  const body = JSON.stringify({ rows });
+  const key = unconfirmedBatch?.body === body ? unconfirmedBatch.key : crypto.randomUUID();
+  unconfirmedBatch = { body, key };
   try {
     const res = await fetch(`${API_BASE}/attendance/bulk`, {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ rows })
+      headers: { "Content-Type": "application/json", "Idempotency-Key": key },
+      body
     });
     if (!res.ok) return { ok: false, inserted: 0 };
+    unconfirmedBatch = null;
     const data = await res.json();
     return { ok: true, inserted: Number(data?.inserted ?? 0) };
   } catch {
@@ -121,15 +162,43 @@ export async function createBulkAttendance(
   }
 }
 
-export async function getAttendanceLogs(): Promise<any[]> {
+export type AttendanceLogFilters = {
+  from?: string;
+  to?: string;
+  professor?: string;
+  subject?: string;
+  status?: string;
+};
+
+export type AttendanceLogPage = { items: any[]; next_cursor: string | null };
+
+// One page of history, newest date first; pass the previous page's next_cursor to continue.
+export async function getAttendanceLogs(
+  filters: AttendanceLogFilters = {},
+  cursor?: string | null
+): Promise<AttendanceLogPage> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(filters)) {
+    if (value) params.set(key, value);
+  }
+  if (cursor) params.set("cursor", cursor);
   try {
-    const res = await fetch(`${API_BASE}/attendance`, { cache: 'no-store' });
-    if (!res.ok) return [];
+    const res = await fetch(`${API_BASE}/attendance?${params}`, { cache: 'no-store' });
+    if (!res.ok) return { items: [], next_cursor: null };
     return res.json();
   } catch (err) {
     console.error(`[API CRASH] /attendance fetch failed:`, err);
-    return [];
+    return { items: [], next_cursor: null };
+  }
+}
+
+// Streamed download of every row matching the filters (not just the loaded pages).
+export function attendanceExportUrl(filters: AttendanceLogFilters = {}, format: "csv" | "ndjson" = "csv"): string {
+  const params = new URLSearchParams({ format });
+  for (const [key, value] of Object.entries(filters)) {
+    if (value) params.set(key, value);
   }
+  return `${API_BASE}/attendance/export?${params}`;
 }
 
 export async function deleteAttendanceLog(id: number): Promise<boolean> {
@@ -45,3 +45,12 @@ export type DashboardSummary = {
   burnout_analysis: Array<{ day: string; attendance: number }>;
   predictive_trajectory: { projected_percentage: number };
 };
+
+export type DashboardBundle = {
+  summary: DashboardSummary;
+  simulator: SubjectCard[];
+  cumulative: CumulativeSubjectCard[];
+  monthly: MonthlySnapshot[];
+};
+
+export type BundleSection = keyof DashboardBundle;